@@ -1,7 +1,25 @@
+import numpy as np
 import pandas as pd
 import streamlit as st
 import plotly.express as px
 
+from compute import load_dashboard_data
+from matching import DEFAULT_WEIGHTS, SUBSCORES, SubscoreCache, order_by_readiness, ranked_matches
+from perf import Timings
+from pipeline import (
+    IN_TRAINING_STAGES,
+    OFFER_PENDING,
+    OFFER_PENDING_COLUMNS,
+    READY,
+    SALARY_COLUMNS,
+    STAGE_TABLE_COLUMNS,
+)
+from refresh import BackgroundRefresher
+from score_store import STORE_TOP_K, ScoreStore
+from history import MetricsHistory, local_today, record_history
+from shared_cache import SharedCache
+from snapshot import publish_snapshot
+
 # ---- PAGE CONFIG (must come FIRST) ----
 st.set_page_config(
     page_title="MIT Candidate Training Dashboard",
@@ -9,6 +27,10 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+# ---- PERFORMANCE TIMINGS ----
+# Laps are only recorded while the sidebar "Performance" panel is switched on
+render_timings = Timings("render", enabled=st.session_state.get("show_perf", False))
+
 # ---- FORCE DARK MODE ACROSS ALL BROWSERS ----
 # This locks dark theme even if Streamlit user/browser has light mode set
 st.markdown("""
@@ -226,96 +248,57 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-# ---- LOAD DATA ----
-@st.cache_data(ttl=60)  # Reduced from 300 to 60 seconds for faster updates
-def load_data():
-    main_data_url = (
-        "https://docs.google.com/spreadsheets/d/e/"
-        "2PACX-1vTAdbdhuieyA-axzb4aLe8c7zdAYXBLPNrIxKRder6j1ZAlj2g4U1k0YzkZbm_dEcSwBik4CJ57FROJ/"
-        "pub?gid=813046237&single=true&output=csv"
-    )
-    try:
-        df = pd.read_csv(main_data_url, skiprows=1)  # Skip only the first row with "Training info"
-        data_source = "Google Sheets"
-    except Exception as e:
-        st.error(f"⚠️ Google Sheets error: {e}")
-        return pd.DataFrame(), "Error"
-
-    df = df.dropna(how="all")
-    df.columns = [c.strip() if isinstance(c, str) else c for c in df.columns]
-    df = df.rename(columns={"Week ": "Week", "Start date": "Start Date"})
-    if "Start Date" in df.columns:
-        df["Start Date"] = pd.to_datetime(df["Start Date"], errors="coerce")
-
-    today = pd.Timestamp.now()
-
-    # Calculate weeks based on start date first, fallback to Week column if calculation fails
-    def calc_weeks_from_start_date(row):
-        """Calculate weeks in program based on start date"""
-        if "Start Date" in row.index and not pd.isna(row["Start Date"]):
-            start = row["Start Date"]
-            if start > today:
-                # Future start date - return negative weeks
-                return int((start - today).days / 7)
-            else:
-                # Past start date - return positive weeks
-                return int(((today - start).days // 7) + 1)
-        return None
-    
-    # Try to calculate weeks from start date first
-    calculated_weeks = df.apply(calc_weeks_from_start_date, axis=1)
-    
-    # Use calculated weeks where possible, fallback to Week column for missing/invalid values
-    if "Week" in df.columns:
-        # Convert Week column to numeric as fallback
-        week_column = pd.to_numeric(df["Week"], errors="coerce")
-        
-        # Use calculated weeks where we have valid start dates, otherwise use Week column
-        df["Week"] = calculated_weeks.where(calculated_weeks.notna(), week_column)
-    else:
-        # No Week column, use calculated weeks
-        df["Week"] = calculated_weeks
-    
-    # Convert final result to numeric
-    df["Week"] = pd.to_numeric(df["Week"], errors="coerce")
-
+render_timings.lap("styles")
 
-    if "Salary" in df.columns:
-        df["Salary"] = (
-            df["Salary"]
-            .astype(str)
-            .str.replace("$", "")
-            .str.replace(",", "")
-            .str.replace(" ", "")
+# ---- LOAD DATA ----
+# Loading, cleaning, classification and feature extraction live in the headless
+# compute/pipeline modules. They run on the background refresh thread, so they
+# report problems through `notices` and the page renders them.
+REFRESH_INTERVAL_SECONDS = 60
+# How far below the refresh interval the shared cache's max_age sits
+SHARED_MAX_AGE_MARGIN_SECONDS = 5
+
+
+@st.cache_resource
+def get_refresher():
+    # One refresher per server process, shared by every viewer and rerun. All
+    # processes on the machine share one on-disk copy of the loaded data, and
+    # only one of them at a time actually refreshes it (and publishes the
+    # snapshot and metrics history).
+    shared = SharedCache()
+
+    def build(previous):
+        # Each load gets the previous one, so only changed rows are rescored
+        data = load_dashboard_data(previous=previous)
+        publish_snapshot(data)
+        record_history(data)
+        return data
+
+    def load(previous, force=False):
+        # The last tick's data is just under one interval old when the next tick
+        # checks it; a max_age of the full interval would reuse it and only
+        # refresh every other tick
+        return shared.load(
+            build, previous,
+            max_age=REFRESH_INTERVAL_SECONDS - SHARED_MAX_AGE_MARGIN_SECONDS, force=force,
         )
-        df["Salary"] = pd.to_numeric(df["Salary"], errors="coerce")
-
-    df["Status"] = df["Status"].astype(str).str.strip().str.lower()
-    return df, data_source
 
+    return BackgroundRefresher(load, interval=REFRESH_INTERVAL_SECONDS)
 
-@st.cache_data(ttl=60)  # Reduced from 300 to 60 seconds for faster updates
-def load_jobs_data():
-    # ✅ Your real Open Jobs Google Sheets URL
-    jobs_url = (
-        "https://docs.google.com/spreadsheets/d/e/"
-        "2PACX-1vSbD6wUrZEt9kuSQpUT2pw0FMOb7h1y8xeX-hDTeiiZUPjtV0ohK_WcFtCSt_4nuxdtn9zqFS8z8aGw/"
-        "pub?gid=116813539&single=true&output=csv"
-    )
-    try:
-        jobs_df = pd.read_csv(jobs_url, skiprows=5, header=0)
-        jobs_df = jobs_df.loc[:, ~jobs_df.columns.str.contains("^Unnamed")]
-        jobs_df = jobs_df.drop(columns=[c for c in ["JV Link", "JV ID"] if c in jobs_df.columns], errors="ignore")
-        jobs_df = jobs_df.dropna(how="all").fillna("")
-        return jobs_df
-    except Exception as e:
-        st.error(f"Error loading jobs data: {e}")
-        return pd.DataFrame()
 
 # ---- LOAD ----
-st.cache_data.clear()
-df, data_source = load_data()
-jobs_df = load_jobs_data()
+# Served from memory instantly; the refresher reloads the sheets in the background.
+# The frames are shared across sessions, so the page must not modify them in place.
+refresher = get_refresher()
+refreshed = st.button("🔄 Refresh now")
+if refreshed:
+    data = refresher.refresh(force=True)
+else:
+    data = refresher.get()
+render_timings.lap("data", refreshed=refreshed)
+df, data_source, jobs_df = data["df"], data["data_source"], data["jobs_df"]
+for level, message in data["notices"]:
+    getattr(st, level)(message)
 
 if df.empty:
     st.error("❌ Unable to load data.")
@@ -324,59 +307,63 @@ if df.empty:
 # ---- HEADER ----
 st.markdown('<div class="dashboard-title">🎓 MIT Candidate Training Dashboard</div>', unsafe_allow_html=True)
 if data_source == "Google Sheets":
-    st.success(f"📊 Data Source: {data_source} | Last Updated: {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    st.success(f"📊 Data Source: {data_source} | Last Updated: {data['loaded_at'].strftime('%Y-%m-%d %H:%M:%S')}")
+
+# ---- SESSION CACHE OF DERIVED DATA ----
+# Stage tables, match scores and the chart are rebuilt only when the data
+# version changes (or their own parameters do), not on every rerun.
+def session_derived(kind, version, params, build):
+    """``build()`` cached in this session for ``version``, keeping the latest ``params`` per kind."""
+    cache = st.session_state.get("derived")
+    if cache is None or cache["version"] != version:
+        cache = st.session_state["derived"] = {"version": version}
+    if kind not in cache or cache[kind][0] != params:
+        cache[kind] = (params, build())
+    return cache[kind][1]
+
+
+def stage_display(df, stage, cols):
+    """Rows of ``df`` in ``stage`` (a stage or list of stages) with ``cols``, formatted for a table."""
+    stages = stage if isinstance(stage, list) else [stage]
+    stage_df = df[df["Stage"].isin(stages)]
+    # Categorical columns only accept their own categories, so fill as plain objects
+    display = stage_df[[col for col in cols if col in stage_df.columns]].astype(object).fillna("—")
+
+    # Clean salary formatting
+    if "Salary" in display.columns:
+        display["Salary"] = (
+            display["Salary"].astype(str).str.replace("$", "").str.replace(",", "").replace("nan", "TBD")
+        )
+    return display
+
+
+# ---- SECTIONS ----
+# Each section is a fragment: a widget inside one (paging the readiness list,
+# opening a candidate) reruns only that section. Fragment reruns keep the data
+# of the last full run; the next full rerun picks up background refreshes.
+version = data["version"]
+
 
 # ---- METRICS ----
-offer_pending = len(df[df["Status"] == "offer pending"])
-offer_accepted = len(df[df["Status"] == "offer accepted"])
-non_identified = len(df[df["Status"].isin(["free agent discussing opportunity", "unassigned", "training"])])
-total_candidates = non_identified + offer_accepted
-
-ready_for_placement = df[
-    df["Week"].apply(lambda x: isinstance(x, (int, float)) and x > 6)
-    & (~df["Status"].isin(["position identified", "offer pending", "offer accepted"]))
-]
-ready = len(ready_for_placement)
-
-in_training = len(
-    df[df["Status"].eq("training") & df["Week"].apply(lambda x: isinstance(x, (int, float)) and x <= 6)]
-)
-open_jobs = len(jobs_df) if not jobs_df.empty else 0
+@st.fragment
+def metrics_section(metrics):
+    col1, col2, col3, col4, col5 = st.columns(5)
+    col1.metric("Total Candidates", metrics["Total Candidates"])
+    col2.metric("Open Positions", metrics["Open Positions"])
+    col3.metric("Ready for Placement", metrics["Ready for Placement"])
+    col4.metric("In Training (Weeks 1–5)", metrics["In Training"])
+    col5.metric("Offer Pending", metrics["Offer Pending"])
 
-col1, col2, col3, col4, col5 = st.columns(5)
-col1.metric("Total Candidates", total_candidates)
-col2.metric("Open Positions", open_jobs)
-col3.metric("Ready for Placement", ready)
-col4.metric("In Training (Weeks 1–5)", in_training)
-col5.metric("Offer Pending", offer_pending)
 
 # ---- CHART ----
-st.markdown("---")
-left_col, right_col = st.columns([1, 1])
-color_map = {
-    "Ready for Placement": "#2E91E5",
-    "In Training": "#E15F99",
-    "Offer Pending": "#A020F0",
-}
-chart_data = pd.DataFrame({
-    "Category": ["Ready for Placement", "In Training", "Offer Pending"],
-    "Count": [ready, in_training, offer_pending]
-})
-
-with right_col:
-    st.subheader("📈 Training Progression Overview")
-    
+def progression_figure(metrics):
     # Create training progression data
-    beginning_training = len(df[df["Status"].eq("training") & df["Week"].apply(lambda x: isinstance(x, (int, float)) and 1 <= x <= 3)])
-    near_ready = len(df[df["Status"].eq("training") & df["Week"].apply(lambda x: isinstance(x, (int, float)) and 4 <= x <= 6)])
-    ready_for_placement = len(df[df["Week"].apply(lambda x: isinstance(x, (int, float)) and x > 6) & (~df["Status"].isin(["position identified", "offer pending", "offer accepted"])) & (df["Status"].notna())])
-    
     progression_data = pd.DataFrame({
         "Training Stage": ["Beginning (Weeks 1-3)", "Near Ready (Weeks 4-6)", "Ready for Placement (Week 7+)"],
-        "Count": [beginning_training, near_ready, ready_for_placement],
+        "Count": [metrics["Beginning Training"], metrics["Near Ready"], metrics["Ready for Placement"]],
         "Stage_Order": [1, 2, 3]
     })
-    
+
     # Create line chart
     fig_line = px.line(
         progression_data, 
@@ -419,243 +406,225 @@ with right_col:
         line=dict(color="#4aa8e0", width=3),
         marker=dict(color="#4aa8e0", size=10, line=dict(color="white", width=2))
     )
-    
+    return fig_line
+
+
+@st.fragment
+def chart_section(metrics, version):
+    st.subheader("📈 Training Progression Overview")
+    fig_line = session_derived("chart", version, None, lambda: progression_figure(metrics))
     st.plotly_chart(fig_line, use_container_width=True)
-    
-   
-with left_col:
+
+
+# ---- TRENDS ----
+TREND_SERIES = ["Ready for Placement", "In Training", "Offer Pending", "Offer Accepted", "Open Positions", "Total Candidates"]
+TREND_DEFAULT_DAYS = 90
+
+
+def trend_figure(trend, series):
+    fig = px.line(
+        trend,
+        x="loaded_at",
+        y=series,
+        markers=True,
+        title="Pipeline Over Time",
+        labels={"loaded_at": "Loaded", "value": "Candidates / Positions", "variable": ""},
+    )
+    fig.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        font_color="white",
+        title_font_color="white",
+        height=400,
+        xaxis=dict(showgrid=True, gridcolor="rgba(255,255,255,0.1)"),
+        yaxis=dict(showgrid=True, gridcolor="rgba(255,255,255,0.1)", zeroline=True, zerolinecolor="rgba(255,255,255,0.2)"),
+        hoverlabel=dict(bgcolor="#1a1d27", font_color="white", font_size=12),
+    )
+    return fig
+
+
+@st.cache_resource
+def get_metrics_history():
+    return MetricsHistory()
+
+
+@st.fragment
+def trend_section(version):
+    st.markdown("---")
+    st.subheader("📉 Pipeline Trends")
+    # Partitions are filed by local date, so the range is too
+    today = local_today()
+    range_col, series_col = st.columns([1, 2])
+    picked = range_col.date_input(
+        "Date range", value=(today - pd.Timedelta(days=TREND_DEFAULT_DAYS), today), max_value=today, key="trend_range"
+    )
+    series = series_col.multiselect("Series", TREND_SERIES, default=TREND_SERIES[:3], key="trend_series")
+    # While picking a range the input briefly holds only the start date
+    if len(picked) != 2 or not series:
+        return
+    start, end = picked
+
+    # Only the days in the range are read; history grows only with new versions
+    trend = session_derived("trend", version, (start, end), lambda: get_metrics_history().read(start, end))
+    if trend.empty:
+        st.markdown('<div class="placeholder-box">No history recorded in this date range yet</div>', unsafe_allow_html=True)
+        return
+    st.plotly_chart(trend_figure(trend, series), use_container_width=True)
+    st.caption(f"{len(trend)} data version(s) between {start:%b %d, %Y} and {end:%b %d, %Y}.")
+
+
+# ---- JOBS TABLE ----
+@st.fragment
+def jobs_section(jobs_df):
     st.subheader("📍 Open Job Positions")
     if not jobs_df.empty:
-        clean_jobs_df = jobs_df[jobs_df["Job Title"].notna()]
+        clean_jobs_df = jobs_df[jobs_df["Job Title"].notna()].drop(columns=SALARY_COLUMNS, errors="ignore")
         st.dataframe(clean_jobs_df, use_container_width=True, height=400, hide_index=True)
     else:
         st.markdown('<div class="placeholder-box">No job positions data available</div>', unsafe_allow_html=True)
 
-# ==========================================================
-# READY FOR PLACEMENT SECTION
-# ==========================================================
-ready_df = df[
-    df["Week"].apply(lambda x: isinstance(x, (int, float)) and x > 6)
-    & (~df["Status"].isin(["position identified", "offer pending", "offer accepted"]))
-    & (df["Status"].notna())
-]
 
-if not ready_df.empty:
-    st.markdown("---")
-    st.markdown("### 🧩 Ready for Placement Candidates")
-
-    # Select relevant columns dynamically
-    ready_cols = [col for col in ["MIT Name", "Training Site", "Location", "Week", "Salary", "Level"] if col in ready_df.columns]
-    ready_display = ready_df[ready_cols].copy().fillna("—")
-
-    # Clean salary formatting
-    if "Salary" in ready_display.columns:
-        ready_display["Salary"] = (
-            ready_display["Salary"].astype(str).str.replace("$", "").str.replace(",", "").replace("nan", "TBD")
+# ---- READY / IN TRAINING TABLES ----
+@st.fragment
+def ready_section(df, version):
+    ready_display = session_derived("ready", version, None, lambda: stage_display(df, READY, STAGE_TABLE_COLUMNS))
+    if not ready_display.empty:
+        st.markdown("---")
+        st.markdown("### 🧩 Ready for Placement Candidates")
+        st.dataframe(
+            ready_display,
+            use_container_width=True,
+            hide_index=True,
+            height=(len(ready_display) * 35 + 60),
         )
+        st.caption(f"{len(ready_display)} candidates are ready for placement — week > 6 and not yet placed.")
+    else:
+        st.markdown('<div class="placeholder-box">No candidates currently ready for placement</div>', unsafe_allow_html=True)
 
-    # Show table
-    st.dataframe(
-        ready_display,
-        use_container_width=True,
-        hide_index=True,
-        height=(len(ready_display) * 35 + 60),
+
+@st.fragment
+def training_section(df, version):
+    train_display = session_derived(
+        "training", version, None, lambda: stage_display(df, IN_TRAINING_STAGES, STAGE_TABLE_COLUMNS)
     )
-    st.caption(f"{len(ready_display)} candidates are ready for placement — week > 6 and not yet placed.")
-else:
-    st.markdown('<div class="placeholder-box">No candidates currently ready for placement</div>', unsafe_allow_html=True)
+    if not train_display.empty:
+        st.markdown("---")
+        st.markdown("### 🏋️ In Training (Weeks 1–5)")
+        st.dataframe(
+            train_display,
+            use_container_width=True,
+            hide_index=True,
+            height=(len(train_display) * 35 + 60),
+        )
+        st.caption(f"{len(train_display)} candidates currently in training (weeks 1–5).")
+    else:
+        st.markdown('<div class="placeholder-box">No candidates currently in training</div>', unsafe_allow_html=True)
 
 
 # ==========================================================
-# IN TRAINING SECTION
+# 🎯 CANDIDATE–JOB MATCH SCORE SECTION (Streamlined Executive View)
 # ==========================================================
-in_training_df = df[
-    df["Status"].eq("training")
-    & df["Week"].apply(lambda x: isinstance(x, (int, float)) and x <= 6)
-]
+PAGE_SIZES = [10, 25, 50, 100]
 
-if not in_training_df.empty:
-    st.markdown("---")
-    st.markdown("### 🏋️ In Training (Weeks 1–5)")
 
-    train_cols = [col for col in ["MIT Name", "Training Site", "Location", "Week", "Salary", "Level"] if col in in_training_df.columns]
-    train_display = in_training_df[train_cols].copy().fillna("—")
+def search_candidates(cand_feats, query):
+    """Positions of candidates whose name or location contains ``query`` (case-insensitive)."""
+    needle = query.strip().lower()
+    if not needle:
+        return np.arange(len(cand_feats))
+    hits = (
+        cand_feats["candidate"].astype(str).str.lower().str.contains(needle, regex=False)
+        | cand_feats["loc_key"].str.contains(needle, regex=False)
+    )
+    return np.flatnonzero(hits.to_numpy())
 
-    if "Salary" in train_display.columns:
-        train_display["Salary"] = (
-            train_display["Salary"].astype(str).str.replace("$", "").str.replace(",", "").replace("nan", "TBD")
-        )
 
-    st.dataframe(
-        train_display,
-        use_container_width=True,
-        hide_index=True,
-        height=(len(train_display) * 35 + 60),
-    )
-    st.caption(f"{len(train_display)} candidates currently in training (weeks 1–5).")
-else:
-    st.markdown('<div class="placeholder-box">No candidates currently in training</div>', unsafe_allow_html=True)
+@st.cache_resource(max_entries=1)
+def get_subscore_cache(version, _cand_feats, _job_feats):
+    # Built the first time someone changes a weight, then shared by every session
+    return SubscoreCache(_cand_feats, _job_feats)
 
-# ==========================================================
-# 🎯 CANDIDATE–JOB MATCH SCORE SECTION (Streamlined Executive View)
-# ==========================================================
-st.markdown("---")
-st.markdown("### 🎯 Placement Readiness Breakdown")
 
-# Filter relevant candidates
-candidates_df = df[
-    df["Status"].isin(["training", "unassigned", "free agent discussing opportunity"])
-].copy()
-candidates_df = candidates_df.dropna(subset=["MIT Name"])
+def readiness_matches(cand_feats, job_feats, rankings, version, query, top_k, weights):
+    # With the standard weights each candidate's best jobs were ranked at load
+    # time; take the first top_k. Other weights re-rank from cached subscores.
+    # Ready first, then training, and within a week the strongest best match first
+    if weights == DEFAULT_WEIGHTS:
+        cols, scores = rankings[0].cols, rankings[0].scores
+    else:
+        cols, scores = get_subscore_cache(version, cand_feats, job_feats).top_job_indices(top_k, weights)
+    rows = search_candidates(cand_feats, query)
+    return order_by_readiness(ranked_matches(cand_feats, job_feats, cols, scores, k=top_k, rows=rows))
+
+
+def weight_sliders():
+    """Subscore weights chosen in the "Scoring weights" expander."""
+    with st.expander("⚖️ Scoring weights"):
+        st.caption("Each subscore is multiplied by its weight before the total is taken.")
+        return {
+            name: col.slider(name, min_value=0.0, max_value=2.0, value=1.0, step=0.1, key=f"weight_{name}")
+            for name, col in zip(SUBSCORES, st.columns(len(SUBSCORES)))
+        }
 
-if not jobs_df.empty and not candidates_df.empty:
 
-    # ---- Salary parsing logic ----
+@st.fragment
+def readiness_section(cand_feats, job_feats, rankings, version):
+    st.markdown("---")
+    st.markdown("### 🎯 Placement Readiness Breakdown")
 
-    def parse_salary(s):
-        if pd.isna(s):
-            return None
-        if isinstance(s, (int, float)):
-            return float(s)
-    
-        # Clean string
-        s = str(s).replace("$", "").replace(",", "").strip()
-    
-        # Normalize formats like "70,000 - 75,000" or "70k-75k"
-        s = s.lower().replace("k", "000").replace("–", "-").replace("—", "-").replace("_", "-")
-    
-        if "-" in s:
-            try:
-                low, high = s.split("-")
-                return (float(low.strip()), float(high.strip()))
-            except ValueError:
-                return None
-        else:
-            try:
-                return float(s)
-            except ValueError:
-                return None
-
-    def midpoint(val):
-        if isinstance(val, tuple):
-            return (val[0] + val[1]) / 2
-        return val if isinstance(val, (int, float)) else None
-
-
-# ---- Apply salary parsing and midpoint logic ----
-    jobs_df["SalaryRange"] = jobs_df["Salary"].apply(parse_salary)
-    candidates_df["SalaryRange"] = candidates_df["Salary"].apply(parse_salary)
-    
-    jobs_df["SalaryMid"] = jobs_df["SalaryRange"].apply(midpoint)
-    candidates_df["SalaryMid"] = candidates_df["SalaryRange"].apply(midpoint)
-
-
-    # ---- Calculate match scores (your scoring stays the same) ----
-    match_results = []
-    for _, c in candidates_df.iterrows():
-        for _, j in jobs_df.iterrows():
-            subscores = {}
-
-            # 1) Vertical Alignment
-            vert_score = 0
-            c_vert = str(c.get("VERT", "")).strip().upper()
-            j_vert = str(j.get("VERT", j.get("Vertical", ""))).strip().upper()
-            if c_vert == j_vert:
-                vert_score += 30
-            exp_str = " ".join(
-                str(c.get(k, "")).lower()
-                for k in c.index if any(x in k.lower() for x in ["experience", "notes", "background"])
-            )
-            if "amazon" in exp_str or "aviation" in exp_str:
-                vert_score += 10
-            subscores["Vertical"] = vert_score
-
-            # 2) Salary Trajectory
-            c_sal, j_sal = c.get("SalaryMid"), j.get("SalaryMid")
-            if j_sal and c_sal:
-                if j_sal >= 1.05 * c_sal:
-                    sal_score = 25
-                elif abs(j_sal - c_sal) / c_sal <= 0.05:
-                    sal_score = 15
-                elif j_sal < 0.95 * c_sal:
-                    sal_score = -10
-                else:
-                    sal_score = 0
-            else:
-                sal_score = 0
-            subscores["Salary"] = sal_score
-
-            # 3) Geographic Fit
-            geo_score = 5
-            cand_loc = str(c.get("Location", "")).strip().lower()
-            job_city = str(j.get("City", "")).strip().lower()
-            job_state = str(j.get("State", "")).strip().upper()
-            if cand_loc == job_city:
-                geo_score = 20
-            elif cand_loc.endswith(job_state.lower()):
-                geo_score = 10
-            subscores["Geo"] = geo_score
-
-            # 4) Confidence
-            conf = str(c.get("Confidence", "")).lower()
-            if "high" in conf:
-                conf_score = 15
-            elif "mod" in conf:
-                conf_score = 10
-            elif "low" in conf:
-                conf_score = 5
-            else:
-                conf_score = 10
-            subscores["Confidence"] = conf_score
-
-            # 5) Readiness
-            week = c.get("Week")
-            if isinstance(week, (int, float)):
-                if week >= 6:
-                    ready_score = 10
-                elif 1 <= week <= 5:
-                    ready_score = week * 1.5
-                else:
-                    ready_score = 5
-            else:
-                ready_score = 5
-            subscores["Readiness"] = ready_score
-
-            total = sum(subscores.values())
-
-            # Safe access for fields that may vary by sheet
-            title_val = j.get("Title") or j.get("Job Title") or "—"
-            vert_val = j.get("VERT") or j.get("Vertical") or "—"
-            acct_val = j.get("Account") or j.get("Job Account") or "—"
-
-            match_results.append({
-                "Candidate": c["MIT Name"],
-                "Job Account": acct_val,
-                "Title": title_val,
-                "City": j.get("City", ""),
-                "State": j.get("State", ""),
-                "VERT": vert_val,
-                "Total Score": round(total, 1),
-                "Week": c.get("Week"),
-                "Status": c.get("Status")
-            })
-
-    match_df = pd.DataFrame(match_results)
-    match_df = match_df.sort_values("Total Score", ascending=False)
-
-    # Ready first, then training
-    match_df["is_ready"] = (match_df["Week"] >= 6).astype(int)
-    match_df = match_df.sort_values(["is_ready", "Week", "Total Score"], ascending=[False, False, False])
-
-    # Expanders per candidate (ready auto-expanded)
-    for candidate, group in match_df.groupby("Candidate", sort=False):
+    if cand_feats is None or cand_feats.empty:
+        st.markdown(
+            '<div class="placeholder-box">No data available to compute match scores</div>',
+            unsafe_allow_html=True
+        )
+        return
+
+    search_col, k_col, size_col = st.columns([2, 1, 1])
+    query = search_col.text_input("Search candidates", placeholder="Name or location")
+    top_k = k_col.slider("Top matches per candidate", min_value=1, max_value=STORE_TOP_K, value=3)
+    page_size = size_col.selectbox("Candidates per page", PAGE_SIZES, index=1)
+    weights = weight_sliders()
+
+    # ---- Match scores (search narrows the candidates) ----
+    match_df = session_derived(
+        "matches", version, (query.strip().lower(), top_k, tuple(weights.values())),
+        lambda: readiness_matches(cand_feats, job_feats, rankings, version, query, top_k, weights),
+    )
+    if match_df.empty:
+        st.info(f"No candidates match “{query.strip()}”.")
+        return
+
+    # ---- Pagination: only the visible page of candidates is built and sent ----
+    groups = match_df.groupby("Candidate", sort=False)
+    candidates = list(groups.groups)
+    n_pages = max((len(candidates) - 1) // page_size + 1, 1)
+    # Keyed on the search and page size so changing either goes back to page 1
+    page = st.number_input(
+        f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1, step=1, key=f"match_page_{query}_{page_size}"
+    )
+    first = (page - 1) * page_size
+    page_candidates = candidates[first:first + page_size]
+    st.caption(f"Showing {first + 1}–{first + len(page_candidates)} of {len(candidates)} candidates")
+
+    # Expanders per candidate (ready auto-expanded). They rerun the section when
+    # toggled, so a collapsed candidate's job list is never built.
+    for candidate in page_candidates:
+        group = groups.get_group(candidate)
         week = group["Week"].iloc[0]
         status = "Ready for Placement" if week >= 6 else "In Training"
         color = "🟢" if week >= 6 else "🟡"
         expanded = True if week >= 6 else False
 
-        top_jobs = group.nlargest(3, "Total Score")
-        with st.expander(f"{color} {candidate} — {status} (Week {int(week)})", expanded=expanded):
+        expander = st.expander(
+            f"{color} {candidate} — {status} (Week {int(week)})",
+            expanded=expanded,
+            key=f"matches_{candidate}",
+            on_change="rerun",
+        )
+        if not expander.open:
+            continue
+        with expander:
+            top_jobs = group.nlargest(top_k, "Total Score")
             # iterate with dicts -> no KeyError from spaces/underscores
             for idx, rec in enumerate(top_jobs.to_dict(orient="records"), start=1):
                 title = rec.get("Title", "—")
@@ -671,21 +640,139 @@ if not jobs_df.empty and not candidates_df.empty:
                 )
             st.markdown("---")
 
-else:
-    st.markdown(
-        '<div class="placeholder-box">No data available to compute match scores</div>',
-        unsafe_allow_html=True
-    )
 
+# ---- TOP CANDIDATES PER OPEN JOB ----
+@st.cache_resource
+def get_score_store(path):
+    return ScoreStore(path)
 
 
+@st.fragment
+def job_candidates_section(store_path, version):
+    st.markdown("---")
+    st.markdown("### 👥 Top Candidates per Open Job")
+    if store_path is None:
+        st.markdown('<div class="placeholder-box">No stored match scores available</div>', unsafe_allow_html=True)
+        return
+
+    # Reads the score store written at load time; nothing is rescored here
+    store = get_score_store(store_path)
+    # Job rows are only meaningful within one version; if this page's version has
+    # been pruned, show the newest stored one as a whole and say so
+    if not store.has_version(version):
+        version = store.latest_version()
+        if version is None:
+            st.markdown('<div class="placeholder-box">No stored match scores available</div>', unsafe_allow_html=True)
+            return
+        st.caption(f"Scores below are from the newer data version {version}; refresh the page to match.")
+    vert_col, state_col, k_col = st.columns([1, 1, 1])
+    top_n = k_col.slider("Candidates per job", min_value=1, max_value=STORE_TOP_K, value=3)
+    ranked = store.top_candidates_per_job(version, k=top_n)
+    verts = ["All"] + sorted(ranked["VERT"].dropna().unique().tolist())
+    states = ["All"] + sorted(ranked["State"].dropna().unique().tolist())
+    vert = vert_col.selectbox("Vertical", verts)
+    state = state_col.selectbox("State", states)
+    if vert != "All" or state != "All":
+        ranked = store.top_candidates_per_job(
+            version, k=top_n, vert=None if vert == "All" else vert, state=None if state == "All" else state
+        )
+    if ranked.empty:
+        st.info("No open jobs match these filters.")
+        return
+
+    ranked.insert(
+        0, "Position", ranked["Title"] + " — " + ranked["Job Account"] + " (" + ranked["City"] + ", " + ranked["State"] + ")"
+    )
+    st.dataframe(
+        ranked[["Position", "Rank", "Candidate", "Total Score", "Week", "Status", "VERT"]],
+        use_container_width=True,
+        hide_index=True,
+        height=400,
+    )
+    st.caption(f"Best {top_n} candidates for each of {ranked['Job'].nunique()} open positions.")
+
 
 # ---- OFFER PENDING SECTION ----
-offer_pending_df = df[df["Status"].str.lower() == "offer pending"]
-if not offer_pending_df.empty:
-    st.markdown("---")
-    st.markdown("### 🤝 Offer Pending Candidates")
-    display_cols = [c for c in ["MIT Name", "Training Site", "Location", "Level"] if c in offer_pending_df.columns]
-    offer_pending_display = offer_pending_df[display_cols].fillna("—")
-    st.dataframe(offer_pending_display, use_container_width=True, hide_index=True)
-    st.caption(f"{len(offer_pending_display)} candidates with pending offers – awaiting final approval/acceptance")
+@st.fragment
+def offer_pending_section(df, version):
+    offer_pending_display = session_derived(
+        "offer_pending", version, None, lambda: stage_display(df, OFFER_PENDING, OFFER_PENDING_COLUMNS)
+    )
+    if not offer_pending_display.empty:
+        st.markdown("---")
+        st.markdown("### 🤝 Offer Pending Candidates")
+        st.dataframe(offer_pending_display, use_container_width=True, hide_index=True)
+        st.caption(f"{len(offer_pending_display)} candidates with pending offers – awaiting final approval/acceptance")
+
+
+# ---- LAYOUT ----
+metrics_section(data["metrics"])
+render_timings.lap("metrics")
+
+st.markdown("---")
+left_col, right_col = st.columns([1, 1])
+with right_col:
+    chart_section(data["metrics"], version)
+render_timings.lap("chart")
+with left_col:
+    jobs_section(jobs_df)
+render_timings.lap("jobs_table", rows=len(jobs_df))
+
+trend_section(version)
+render_timings.lap("trends")
+
+# ==========================================================
+# READY FOR PLACEMENT SECTION
+# ==========================================================
+ready_section(df, version)
+render_timings.lap("ready_table", rows=data["metrics"]["Ready for Placement"])
+
+# ==========================================================
+# IN TRAINING SECTION
+# ==========================================================
+training_section(df, version)
+render_timings.lap("training_table", rows=data["metrics"]["In Training"])
+
+# Feature tables for training/unassigned/free-agent candidates, built at load time
+cand_feats, job_feats = data["cand_feats"], data["job_feats"]
+readiness_section(cand_feats, job_feats, data["rankings"], version)
+render_timings.lap("readiness", pairs=len(cand_feats) * len(job_feats) if cand_feats is not None else 0)
+
+job_candidates_section(data["score_store"], version)
+render_timings.lap("job_candidates")
+
+offer_pending_section(df, version)
+render_timings.lap("offer_pending", rows=data["metrics"]["Offer Pending"])
+
+
+# ---- PERFORMANCE PANEL ----
+def render_perf_panel():
+    """Sidebar breakdown of this rerun and of the load that produced its data."""
+    st.sidebar.markdown("### ⏱️ Performance")
+    if not render_timings.enabled:
+        st.sidebar.caption("Timings start with the next rerun.")
+        return
+    st.sidebar.markdown(
+        f"**Data:** {'refreshed now' if refreshed else 'served from memory'} "
+        f"(version {data['version']}, loaded {data['loaded_at'].strftime('%H:%M:%S')})"
+    )
+    st.sidebar.markdown(
+        "**Sheets:** " + ", ".join(f"{name} — {how}" for name, how in data["fetch_status"].items())
+    )
+    pairs = len(cand_feats) * len(job_feats) if cand_feats is not None else 0
+    st.sidebar.markdown(
+        f"**Rows:** {len(df)} candidates, {len(jobs_df)} jobs  \n"
+        f"**Pair grid:** {pairs:,} candidate × job pairs"
+    )
+    st.sidebar.markdown(f"**Last rerun:** {render_timings.total_ms():.0f} ms")
+    st.sidebar.dataframe(pd.DataFrame(render_timings.spans)[["stage", "ms"]], hide_index=True, use_container_width=True)
+    st.sidebar.markdown(f"**Last load:** {sum(s['ms'] for s in data['timings']):.0f} ms")
+    st.sidebar.dataframe(pd.DataFrame(data["timings"])[["stage", "ms"]], hide_index=True, use_container_width=True)
+    memory = data["memory"].groupby("frame", sort=False)["bytes"].sum() / 2**20
+    st.sidebar.markdown(f"**Memory:** {memory.sum():.2f} MB in loaded frames")
+    st.sidebar.dataframe(memory.round(3).rename("MB").reset_index(), hide_index=True, use_container_width=True)
+
+
+st.sidebar.checkbox("Performance", key="show_perf")
+if st.session_state.get("show_perf"):
+    render_perf_panel()
@@ -0,0 +1,177 @@
+"""Time each dashboard pipeline stage on synthetic sheets of increasing size.
+
+    python -m benchmarks.run                                  # every default size
+    python -m benchmarks.run --sizes 50x50,1000x2000 --out bench.json
+    python -m benchmarks.run --compare baseline.json          # flag regressions
+
+Stages run in pipeline order on the output of the previous stage: CSV parse,
+cleaning (``load_data``/``load_jobs_data``, which includes classification),
+classification alone, metrics, feature extraction, top-k scoring, and
+building the readiness-section markdown the page would send. Each stage is
+timed untraced, then run again under ``tracemalloc`` for its peak memory.
+"""
+import argparse
+import io
+import json
+import platform
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import candidates_csv, jobs_csv
+from blocking import blocked_top_job_indices
+from compute import compute_metrics
+from matching import candidate_features, job_features, order_by_readiness, ranked_matches, top_matches
+from pipeline import MATCHABLE_STATUSES, SHEETS, classify_stages, load_data, load_jobs_data
+from sheets import DOWNLOADED, FetchResult
+
+DEFAULT_SIZES = [(50, 50), (500, 500), (1000, 2000), (5000, 10000), (10000, 20000)]
+TODAY = "2026-01-05"
+TOP_K = 3
+
+
+def _stage(results, name, fn, *args):
+    start = time.perf_counter()
+    out = fn(*args)
+    seconds = time.perf_counter() - start
+
+    # tracemalloc slows Python-heavy stages a lot, so peak memory comes from a second, traced call
+    tracemalloc.start()
+    fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    results[name] = {"seconds": round(seconds, 6), "peak_mb": round(peak / 2**20, 3)}
+    return out
+
+
+def _parse(cand_bytes, jobs_bytes):
+    kwargs = {sheet.name: sheet.read_csv_kwargs for sheet in SHEETS}
+    return (
+        FetchResult(pd.read_csv(io.BytesIO(cand_bytes), **kwargs["candidates"]), DOWNLOADED, None),
+        FetchResult(pd.read_csv(io.BytesIO(jobs_bytes), **kwargs["jobs"]), DOWNLOADED, None),
+    )
+
+
+def _clean(fetched):
+    df, _ = load_data(fetched[0], [], today=TODAY)
+    return df, load_jobs_data(fetched[1], [])
+
+
+def _features(df, jobs_df):
+    candidates_df = df[df["Status"].isin(MATCHABLE_STATUSES)].dropna(subset=["MIT Name"])
+    return candidate_features(candidates_df), job_features(jobs_df)
+
+
+def _score(cand_feats, job_feats, workers, blocking):
+    if blocking:
+        cols, scores = blocked_top_job_indices(cand_feats, job_feats, TOP_K)
+        return ranked_matches(cand_feats, job_feats, cols, scores)
+    return top_matches(cand_feats, job_feats, TOP_K, workers=workers)
+
+
+def _render(match_df):
+    """The per-candidate expander labels and markdown the readiness section writes."""
+    blocks = []
+    for candidate, group in order_by_readiness(match_df).groupby("Candidate", sort=False):
+        week = group["Week"].iloc[0]
+        label = f"{candidate} — {'Ready for Placement' if week >= 6 else 'In Training'} (Week {week})"
+        lines = [
+            f"**{i}. {rec['Title']} — {rec['Job Account']}**  \n"
+            f"📍 {rec['City']}, {rec['State']} | 🏢 {rec['VERT']} | ⭐ Match Score: {rec['Total Score']}/100"
+            for i, rec in enumerate(group.to_dict(orient="records"), start=1)
+        ]
+        blocks.append((label, lines))
+    return blocks
+
+
+def run_size(n_cand, n_jobs, seed=0, workers=None, blocking=False):
+    cand_bytes, jobs_bytes = candidates_csv(n_cand, seed, TODAY), jobs_csv(n_jobs, seed)
+    stages = {}
+    fetched = _stage(stages, "parse", _parse, cand_bytes, jobs_bytes)
+    df, jobs_df = _stage(stages, "clean", _clean, fetched)
+    _stage(stages, "classify", classify_stages, df)
+    _stage(stages, "metrics", compute_metrics, df, jobs_df)
+    cand_feats, job_feats = _stage(stages, "features", _features, df, jobs_df)
+    match_df = _stage(stages, "score", _score, cand_feats, job_feats, workers, blocking)
+    _stage(stages, "render", _render, match_df)
+    return {
+        "candidates": n_cand,
+        "jobs": n_jobs,
+        "matchable_candidates": len(cand_feats),
+        "pairs": len(cand_feats) * len(job_feats),
+        "stages": stages,
+        "total_seconds": round(sum(s["seconds"] for s in stages.values()), 6),
+    }
+
+
+def compare(results, baseline, threshold):
+    """Print per-stage slowdowns against ``baseline``; return the regressions found."""
+    base = {(r["candidates"], r["jobs"]): r["stages"] for r in baseline["results"]}
+    regressions = []
+    for r in results:
+        old = base.get((r["candidates"], r["jobs"]))
+        if not old:
+            continue
+        for stage, new in r["stages"].items():
+            if stage not in old or old[stage]["seconds"] <= 0:
+                continue
+            ratio = new["seconds"] / old[stage]["seconds"]
+            flag = " REGRESSION" if ratio > threshold else ""
+            print(f"{r['candidates']}x{r['jobs']} {stage:<9} {old[stage]['seconds']:.4f}s -> {new['seconds']:.4f}s ({ratio:.2f}x){flag}")
+            if flag:
+                regressions.append((r["candidates"], r["jobs"], stage, ratio))
+    return regressions
+
+
+def _parse_sizes(text):
+    return [tuple(int(x) for x in size.lower().split("x")) for size in text.split(",")]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard pipeline on synthetic data.")
+    parser.add_argument("--sizes", type=_parse_sizes, default=DEFAULT_SIZES, help="comma-separated CxJ sizes, e.g. 50x50,1000x2000")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, help="scoring processes (default: chosen from the grid size)")
+    parser.add_argument("--blocking", action="store_true", help="score with the vertical/state blocking index")
+    parser.add_argument("--out", default="bench_results.json", help="where to write results (default: bench_results.json)")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio reported as a regression (default: 1.25)")
+    args = parser.parse_args(argv)
+
+    results = []
+    for n_cand, n_jobs in args.sizes:
+        result = run_size(n_cand, n_jobs, args.seed, args.workers, args.blocking)
+        results.append(result)
+        stages = "  ".join(f"{name}={s['seconds']:.3f}s/{s['peak_mb']:.0f}MB" for name, s in result["stages"].items())
+        print(f"{n_cand}x{n_jobs}: {stages}")
+
+    report = {
+        "meta": {
+            "created": pd.Timestamp.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "seed": args.seed,
+            "top_k": TOP_K,
+            "workers": args.workers,
+            "blocking": args.blocking,
+        },
+        "results": results,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"wrote {args.out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
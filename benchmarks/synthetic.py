@@ -0,0 +1,82 @@
+"""Synthetic candidate and open-jobs sheets shaped like the published CSVs."""
+import io
+
+import numpy as np
+import pandas as pd
+
+VERTICALS = ["Amazon", "Aviation", "Healthcare", "Education", "Manufacturing", "Tech", "Finance"]
+CITIES = [
+    ("Seattle", "WA"), ("Tacoma", "WA"), ("Austin", "TX"), ("Dallas", "TX"), ("Houston", "TX"),
+    ("Denver", "CO"), ("Phoenix", "AZ"), ("Atlanta", "GA"), ("Chicago", "IL"), ("Boston", "MA"),
+    ("Miami", "FL"), ("Orlando", "FL"), ("Columbus", "OH"), ("Charlotte", "NC"), ("Portland", "OR"),
+]
+STATUSES = [
+    "Training", "training", "Unassigned", "Free Agent Discussing Opportunity",
+    "Offer Pending", "Offer Accepted", "Position Identified",
+]
+STATUS_WEIGHTS = [0.35, 0.1, 0.15, 0.1, 0.1, 0.1, 0.1]
+CONFIDENCE = ["High", "Moderate", "Low", "", "TBD"]
+EXPERIENCE = ["Amazon fulfillment lead", "Aviation ground ops", "Retail manager", "Military logistics", ""]
+
+
+def candidates_frame(n, seed=0, today="2026-01-05"):
+    """``n`` candidate rows with the columns app.py expects."""
+    rng = np.random.default_rng(seed)
+    today = pd.Timestamp(today)
+    city = rng.integers(len(CITIES), size=n)
+    start = today + pd.to_timedelta(rng.integers(-120, 30, size=n), unit="D")
+    has_start = rng.random(n) < 0.85
+    salary = rng.integers(55, 95, size=n) * 1000
+    salary_text = np.where(rng.random(n) < 0.5, [f"${s:,}" for s in salary], salary.astype(str))
+    return pd.DataFrame({
+        "MIT Name": [f"Candidate {i:05d}" for i in range(n)],
+        "Status": rng.choice(STATUSES, size=n, p=STATUS_WEIGHTS),
+        "Week ": np.where(has_start, "", rng.integers(1, 12, size=n).astype(str)),
+        "Start date": np.where(has_start, start.strftime("%m/%d/%Y"), ""),
+        "Salary": np.where(rng.random(n) < 0.1, "", salary_text),
+        "VERT": rng.choice(VERTICALS, size=n),
+        "Location": [f"{CITIES[c][0]}, {CITIES[c][1]}" if rng.random() < 0.5 else CITIES[c][0] for c in city],
+        "Confidence": rng.choice(CONFIDENCE, size=n),
+        "Training Site": rng.choice([f"Site {i}" for i in range(40)], size=n),
+        "Level": rng.choice(["L1", "L2", "L3"], size=n),
+        "Prior Experience": rng.choice(EXPERIENCE, size=n),
+        "Notes": rng.choice(["", "Relocation ok", "Prefers nights"], size=n),
+    })
+
+
+def jobs_frame(n, seed=0):
+    """``n`` open-job rows with the columns app.py expects."""
+    rng = np.random.default_rng(seed + 1)
+    city = rng.integers(len(CITIES), size=n)
+    low = rng.integers(55, 95, size=n)
+    salary = np.where(
+        rng.random(n) < 0.5,
+        [f"{lo}k-{lo + 5}k" for lo in low],
+        [f"${lo * 1000:,}" for lo in low],
+    )
+    return pd.DataFrame({
+        "Job Title": rng.choice(["Site Manager", "Operations Lead", "Account Manager", "Shift Supervisor"], size=n),
+        "Account": [f"Account {i}" for i in rng.integers(500, size=n)],
+        "VERT": rng.choice(VERTICALS, size=n),
+        "City": [CITIES[c][0] for c in city],
+        "State": [CITIES[c][1] for c in city],
+        "Salary": np.where(rng.random(n) < 0.1, "", salary),
+        "JV Link": "https://example.invalid/jv",
+        "JV ID": rng.integers(10000, 99999, size=n),
+    })
+
+
+def candidates_csv(n, seed=0, today="2026-01-05"):
+    """Candidate sheet bytes, with the "Training info" banner row the loader skips."""
+    buf = io.StringIO()
+    buf.write("Training info\n")
+    candidates_frame(n, seed, today).to_csv(buf, index=False)
+    return buf.getvalue().encode("utf-8")
+
+
+def jobs_csv(n, seed=0):
+    """Open-jobs sheet bytes, with the five preamble rows the loader skips."""
+    buf = io.StringIO()
+    buf.write("Open Jobs\n\n\n\n\n")
+    jobs_frame(n, seed).to_csv(buf, index=False)
+    return buf.getvalue().encode("utf-8")
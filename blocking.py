@@ -0,0 +1,170 @@
+"""Blocked top-k: score only the candidate–job pairs that can make a top k.
+
+Jobs are grouped into blocks by normalized vertical and state, and
+candidates into groups the same way. For every candidate and job block, an
+upper bound on the total score of any job in that block comes from the
+block's best-case subscores:
+
+* vertical: 30 only if the block's vertical matches, plus the candidate's
+  experience bonus;
+* salary: from the block's highest salary;
+* geo: 20 if the block is in the candidate's state (or either state is
+  unknown), otherwise the distance band of the nearest point of the
+  block's bounding circle;
+* confidence and readiness are the candidate's own.
+
+Each group is first scored against the blocks with the best bounds. A
+candidate is finished once every block not scored yet has a bound strictly
+below its current ``k``-th best score, because no job there can reach (or
+tie) the top ``k``. Otherwise the offending blocks are added and the
+candidate is rescored. The result is exactly ``top_job_indices``, ties
+included, at a cost that follows the number of plausible pairs instead of
+candidates × jobs.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from locations import EARTH_RADIUS_MILES
+from matching import (
+    DEFAULT_GEO_SCORE,
+    GEO_DISTANCE_BANDS,
+    SAME_CITY_GEO_SCORE,
+    _subscores,
+    _total_score,
+    encode_features,
+    top_k_indices,
+)
+
+# Per-block summaries used for the bounds; ``of_job`` is each job's block
+JobBlocks = namedtuple("JobBlocks", ["of_job", "sizes", "vert", "state", "max_salary", "center", "radius"])
+
+# Slack (radians) so rounding in the bound never excludes a job the scorer would place in a band
+_ANGLE_SLACK = 1e-9
+
+
+def _pair_subset(encoded, rows, cols):
+    return {name: arr[rows] if name.startswith("c_") else arr[cols] for name, arr in encoded.items()}
+
+
+def job_blocks(encoded):
+    """Group the encoded jobs by (vertical, state) and summarize each block."""
+    of_job, keys = pd.factorize(pd.MultiIndex.from_arrays([encoded["j_vert"], encoded["j_state"]]))
+    n_blocks = len(keys)
+    sizes = np.bincount(of_job, minlength=n_blocks)
+
+    salary = encoded["j_salary"]
+    valid = np.nan_to_num(salary) != 0
+    max_salary = np.full(n_blocks, -np.inf)
+    np.maximum.at(max_salary, of_job[valid], salary[valid])
+
+    # Bounding circle of each block's resolved jobs: mean direction and widest angle from it
+    xyz = encoded["j_xyz"]
+    placed = ~np.isnan(xyz).any(axis=1)
+    center = np.zeros((n_blocks, 3))
+    np.add.at(center, of_job[placed], xyz[placed])
+    norm = np.linalg.norm(center, axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        center = np.where(norm > 0, center / norm, np.nan)
+    radius = np.zeros(n_blocks)
+    angle = np.arccos(np.clip(np.einsum("ij,ij->i", xyz[placed], center[of_job[placed]]), -1, 1))
+    np.maximum.at(radius, of_job[placed], angle)
+
+    return JobBlocks(
+        of_job, sizes,
+        keys.get_level_values(0).to_numpy(), keys.get_level_values(1).to_numpy(),
+        max_salary, center, radius,
+    )
+
+
+def upper_bounds(encoded, blocks, rows):
+    """Highest total any job of each block can reach, for candidate positions ``rows`` (R × B)."""
+    c_vert = encoded["c_vert"][rows][:, None]
+    c_state = encoded["c_state"][rows][:, None]
+    c_sal = encoded["c_salary"][rows][:, None]
+
+    vert = np.where(c_vert == blocks.vert[None, :], 30, 0) + np.where(encoded["c_exp"][rows], 10, 0)[:, None]
+
+    # Mirrors the salary subscore, with the block's highest salary standing in for every job
+    b_sal = blocks.max_salary[None, :]
+    valid = (np.nan_to_num(c_sal) != 0) & np.isfinite(b_sal)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sal = np.select(
+            [~valid, c_sal < 0, b_sal >= 1.05 * c_sal, (b_sal >= 0.95 * c_sal) | (np.abs(b_sal - c_sal) / c_sal <= 0.05)],
+            [0, 25, 25, 15],
+            default=0,
+        )
+
+    # Different known states can only score by distance; lower-bound it with the bounding circle
+    open_state = (c_state < 0) | (blocks.state[None, :] < 0) | (c_state == blocks.state[None, :])
+    with np.errstate(invalid="ignore"):
+        to_center = np.arccos(np.clip(encoded["c_xyz"][rows] @ blocks.center.T, -1, 1))
+        nearest = np.maximum(to_center - blocks.radius[None, :] - _ANGLE_SLACK, 0)
+        within = [nearest <= miles / EARTH_RADIUS_MILES for miles, _ in GEO_DISTANCE_BANDS]
+    geo = np.select(
+        [open_state] + within,
+        [SAME_CITY_GEO_SCORE] + [score for _, score in GEO_DISTANCE_BANDS],
+        default=DEFAULT_GEO_SCORE,
+    )
+
+    n_blocks = len(blocks.sizes)
+    ones = np.ones((1, n_blocks))
+    return _total_score({
+        "Vertical": vert,
+        "Salary": sal,
+        "Geo": geo,
+        "Confidence": encoded["c_conf"][rows][:, None] * ones,
+        "Readiness": encoded["c_readiness"][rows][:, None] * ones,
+    })
+
+
+def blocked_top_job_indices(cand_feats, job_feats, k=3, block_size=512, stats=None):
+    """Same result as ``top_job_indices``, scoring only pairs whose block can reach the top ``k``.
+
+    ``stats``, if given, is a dict that gets the number of pairs scored.
+    """
+    encoded = encode_features(cand_feats, job_feats)
+    n_cand, n_jobs = len(cand_feats), len(job_feats)
+    k_eff = max(min(k, n_jobs), 0)
+    best_cols = np.empty((n_cand, k_eff), dtype=np.intp)
+    best_scores = np.empty((n_cand, k_eff))
+    scored = 0
+    if k_eff == 0 or n_cand == 0:
+        if stats is not None:
+            stats["pairs_scored"] = scored
+        return best_cols, best_scores
+
+    blocks = job_blocks(encoded)
+    group_of, _ = pd.factorize(pd.MultiIndex.from_arrays([encoded["c_vert"], encoded["c_state"]]))
+    order = np.argsort(group_of, kind="stable")
+    bounds_at = np.flatnonzero(np.diff(group_of[order])) + 1
+    for group in np.split(order, bounds_at):
+        for start in range(0, len(group), block_size):
+            rows = group[start:start + block_size]
+            ub = upper_bounds(encoded, blocks, rows)
+
+            # Start with the best-bounded blocks that hold at least k jobs between them
+            first = np.argsort(-ub.max(axis=0), kind="stable")
+            n_first = np.searchsorted(np.cumsum(blocks.sizes[first]), k_eff) + 1
+            chosen = np.zeros(len(blocks.sizes), dtype=bool)
+            chosen[first[:n_first]] = True
+
+            pending = np.arange(len(rows))
+            while len(pending):
+                cols = np.flatnonzero(chosen[blocks.of_job])
+                totals = _total_score(_subscores(_pair_subset(encoded, rows[pending], cols)))
+                scored += totals.size
+                top = top_k_indices(totals, k_eff)
+                top_scores = np.take_along_axis(totals, top, axis=1)
+                # A block left out is safe only if none of its jobs could reach or tie the k-th score
+                reach = ub[pending][:, ~chosen] >= top_scores[:, -1:]
+                done = ~reach.any(axis=1)
+                best_cols[rows[pending[done]]] = cols[top[done]]
+                best_scores[rows[pending[done]]] = top_scores[done]
+                chosen[np.flatnonzero(~chosen)[reach.any(axis=0)]] = True
+                pending = pending[~done]
+
+    if stats is not None:
+        stats["pairs_scored"] = scored
+    return best_cols, best_scores
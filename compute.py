@@ -0,0 +1,252 @@
+"""Headless compute core: load → normalize → classify → score.
+
+The Streamlit page only renders what ``load_dashboard_data`` returns, and the
+same pipeline runs from the command line to precompute results on a
+schedule::
+
+    python compute.py --out results/ --format parquet
+    python compute.py --candidates roster.csv --jobs jobs.csv --today 2026-01-05 --format json
+"""
+import argparse
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from blocking import blocked_top_job_indices
+from history import HISTORY_DIR, record_history
+from incremental import update_rankings
+from locations import unresolved_summary
+from matching import candidate_features, job_features, order_by_readiness, ranked_matches, top_matches
+from perf import Timings, memory_report
+from pipeline import (
+    ACTIVE_STATUSES,
+    BEGINNING,
+    IN_TRAINING_STAGES,
+    MATCHABLE_STATUSES,
+    NEAR_READY,
+    OFFER_PENDING,
+    READY,
+    SHEETS,
+    load_data,
+    load_jobs_data,
+)
+from score_store import STORE_PATH, STORE_TOP_K, ScoreStore
+from sheets import FetchResult, fetch_sheets
+
+# How a sheet read from a local file was served
+LOCAL = "local file"
+
+OUTPUT_FORMATS = ["parquet", "csv", "json"]
+
+
+def _is_url(source):
+    return source.startswith(("http://", "https://"))
+
+
+def fetch_sources(sources=None):
+    """Fetch every sheet in ``SHEETS``, optionally overriding where each comes from.
+
+    ``sources`` maps a sheet name to a URL or a local CSV path. URLs go
+    through the concurrent snapshot-cached fetcher; local files are read
+    with the sheet's own ``read_csv`` options.
+    """
+    sources = sources or {}
+    sheets = [sheet._replace(url=sources.get(sheet.name, sheet.url)) for sheet in SHEETS]
+    fetched = fetch_sheets([sheet for sheet in sheets if _is_url(sheet.url)])
+    for sheet in sheets:
+        if not _is_url(sheet.url):
+            try:
+                fetched[sheet.name] = FetchResult(pd.read_csv(sheet.url, **(sheet.read_csv_kwargs or {})), LOCAL, None)
+            except Exception as e:
+                fetched[sheet.name] = FetchResult(None, None, e)
+    return fetched
+
+
+def compute_metrics(df, jobs_df):
+    """Headline counts shown in the metric cards and the progression chart."""
+    stage_counts = df["Stage"].value_counts() if "Stage" in df.columns else pd.Series(dtype=int)
+    return {
+        "Total Candidates": int(df["Status"].isin(ACTIVE_STATUSES).sum()) if "Status" in df.columns else 0,
+        "Open Positions": len(jobs_df),
+        "Ready for Placement": int(stage_counts.get(READY, 0)),
+        "In Training": int(stage_counts.reindex(IN_TRAINING_STAGES, fill_value=0).sum()),
+        "Offer Pending": int(stage_counts.get(OFFER_PENDING, 0)),
+        "Beginning Training": int(stage_counts.get(BEGINNING, 0)),
+        "Near Ready": int(stage_counts.get(NEAR_READY, 0)),
+    }
+
+
+def data_version(*frames):
+    """Content hash of the loaded frames; loads of identical data share a version."""
+    digest = hashlib.sha256()
+    for frame in frames:
+        digest.update(repr(list(frame.columns)).encode("utf-8"))
+        digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+
+def _location_labels(df, cols):
+    """The non-blank ``cols`` of each row joined with ", "."""
+    parts = [df[col].astype(object).fillna("").astype(str).str.strip() for col in cols if col in df.columns]
+    if not parts:
+        return pd.Series("", index=df.index, dtype=object)
+    return pd.concat(parts, axis=1).agg(lambda row: ", ".join(v for v in row if v), axis=1)
+
+
+def _location_notices(candidates_df, cand_feats, jobs_df, job_feats, notices):
+    # Unresolved locations still match on their city/state keys, just not by distance
+    for sheet, labels, feats in [
+        ("candidate", _location_labels(candidates_df, ["Location"]), cand_feats),
+        ("job", _location_labels(jobs_df, ["City", "State"]), job_feats),
+    ]:
+        count, examples = unresolved_summary(labels.to_numpy(), feats["lat"].notna().to_numpy())
+        if count:
+            notices.append((
+                "info",
+                f"{count} {sheet} location(s) aren't in the gazetteer and are scored by city/state only, "
+                f"e.g. {', '.join(examples)}.",
+            ))
+
+
+def load_dashboard_data(sources=None, today=None, store_path=STORE_PATH, previous=None, workers=None, blocking=False):
+    """Run the whole pipeline: load, clean, classify, extract features and rank.
+
+    Returns the cleaned frames, their content version, their metrics, the
+    match feature tables, the rankings, any notices raised while loading,
+    per-stage load timings and a per-column memory report of the frames.
+
+    ``rankings`` holds each candidate's top ``STORE_TOP_K`` jobs and each
+    job's top candidates. Passing the previous load's result as ``previous``
+    rescores only the candidate and job rows that changed since then;
+    ``workers`` is passed on to ``top_job_indices`` for full rescores;
+    ``blocking`` uses ``blocked_top_job_indices`` for them instead.
+    Each new data version's best pairs are also written to the score store
+    at ``store_path`` (``None`` skips it); ``score_store`` in the result is
+    that path, or ``None`` if nothing could be stored.
+    """
+    notices = []
+    timings = Timings("load")
+    with timings.span("fetch"):
+        fetched = fetch_sources(sources)
+    with timings.span("clean_candidates"):
+        df, data_source = load_data(fetched["candidates"], notices, today=today)
+    with timings.span("clean_jobs"):
+        jobs_df = load_jobs_data(fetched["jobs"], notices)
+    with timings.span("metrics"):
+        metrics = compute_metrics(df, jobs_df)
+
+    # Match features only depend on the loaded sheets, so build them once per refresh
+    cand_feats = job_feats = None
+    if not df.empty and not jobs_df.empty:
+        with timings.span("features"):
+            candidates_df = df[df["Status"].isin(MATCHABLE_STATUSES)].dropna(subset=["MIT Name"])
+            cand_feats, job_feats = candidate_features(candidates_df), job_features(jobs_df)
+        _location_notices(candidates_df, cand_feats, jobs_df, job_feats, notices)
+
+    version = data_version(df, jobs_df)
+    rankings = None
+    if cand_feats is not None:
+        with timings.span("rank", pairs=len(cand_feats) * len(job_feats)) as span:
+            rankings, rescored = update_rankings(
+                (previous or {}).get("rankings"), cand_feats, job_feats, STORE_TOP_K, workers=workers, blocking=blocking,
+            )
+            if span is not None:
+                span.fields.update(
+                    candidates_rescored=rescored["candidates"]["rescored"],
+                    jobs_rescored=rescored["jobs"]["rescored"],
+                )
+
+    stored = None
+    if store_path and cand_feats is not None and not cand_feats.empty:
+        with timings.span("score_store", pairs=len(cand_feats) * len(job_feats)):
+            try:
+                ScoreStore(store_path).write(version, cand_feats, job_feats, rankings=rankings)
+                stored = store_path
+            except Exception as e:
+                notices.append(("warning", f"⚠️ Match scores could not be stored: {e}"))
+    return {
+        "df": df,
+        "data_source": data_source,
+        "jobs_df": jobs_df,
+        "version": version,
+        "metrics": metrics,
+        "cand_feats": cand_feats,
+        "job_feats": job_feats,
+        "rankings": rankings,
+        "notices": notices,
+        "loaded_at": pd.Timestamp.now(),
+        # How each sheet was served (downloaded, not modified, unchanged, stale snapshot, local file)
+        "fetch_status": {name: result.how or "error" for name, result in fetched.items()},
+        "score_store": stored,
+        "timings": timings.spans,
+        "memory": memory_report({"candidates": df, "jobs": jobs_df, "candidate features": cand_feats, "job features": job_feats}),
+    }
+
+
+def compute_top_matches(data, k=3, workers=None, blocking=False):
+    """Top ``k`` jobs per candidate, ready candidates first."""
+    if data["cand_feats"] is None or data["cand_feats"].empty:
+        return pd.DataFrame()
+    if data.get("rankings") is not None and k <= STORE_TOP_K:
+        top_jobs = data["rankings"][0]
+        return order_by_readiness(ranked_matches(data["cand_feats"], data["job_feats"], top_jobs.cols, top_jobs.scores, k=k))
+    if blocking:
+        cols, scores = blocked_top_job_indices(data["cand_feats"], data["job_feats"], k)
+        return order_by_readiness(ranked_matches(data["cand_feats"], data["job_feats"], cols, scores))
+    return order_by_readiness(top_matches(data["cand_feats"], data["job_feats"], k=k, workers=workers))
+
+
+def write_frame(df, path, fmt):
+    """Write ``df`` to ``path`` (without extension) as parquet, csv or json."""
+    path = f"{path}.{fmt}"
+    if fmt == "parquet":
+        # Sheet columns can mix numbers and text; Arrow needs one type per column
+        text_cols = {col: "string" for col in df.columns if df[col].dtype == object}
+        df.astype(text_cols).to_parquet(path, index=False)
+    elif fmt == "csv":
+        df.to_csv(path, index=False)
+    else:
+        df.to_json(path, orient="records", date_format="iso", indent=2)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compute MIT dashboard metrics and top job matches without the UI.")
+    parser.add_argument("--candidates", help="URL or local CSV for the candidate sheet (default: published Google Sheet)")
+    parser.add_argument("--jobs", help="URL or local CSV for the open jobs sheet (default: published Google Sheet)")
+    parser.add_argument("--out", default="results", help="output directory (default: results)")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="parquet", help="format for match tables (default: parquet)")
+    parser.add_argument("--top-k", type=int, default=3, help="matches kept per candidate (default: 3)")
+    parser.add_argument("--workers", type=int, help="scoring processes (default: a pool only for very large grids)")
+    parser.add_argument("--blocking", action="store_true", help="only score candidate-job pairs whose vertical/state block can reach the top k")
+    parser.add_argument("--store", default=STORE_PATH, help="SQLite score store to update; empty to skip (default: .score_store.sqlite)")
+    parser.add_argument("--history", default=HISTORY_DIR, help="metrics history to append to; empty to skip (default: .metrics_history)")
+    parser.add_argument("--memory", action="store_true", help="print how much memory each loaded frame uses")
+    parser.add_argument("--today", help="reference date for weeks in program, e.g. 2026-01-05 (default: now)")
+    args = parser.parse_args(argv)
+
+    sources = {name: src for name, src in [("candidates", args.candidates), ("jobs", args.jobs)] if src}
+    data = load_dashboard_data(sources, today=args.today, store_path=args.store or None, workers=args.workers, blocking=args.blocking)
+    # Same as the app: skipped for an empty load, and a failure is reported as a notice
+    record_history(data, args.history)
+    for level, message in data["notices"]:
+        print(f"{level}: {message}")
+    if data["df"].empty:
+        return 1
+    if args.memory:
+        memory = data["memory"]
+        for frame, nbytes in memory.groupby("frame", sort=False)["bytes"].sum().items():
+            print(f"{frame}: {nbytes / 2**20:.3f} MB")
+
+    os.makedirs(args.out, exist_ok=True)
+    with open(os.path.join(args.out, "metrics.json"), "w", encoding="utf-8") as f:
+        json.dump(data["metrics"], f, indent=2)
+    written = write_frame(compute_top_matches(data, k=args.top_k, workers=args.workers, blocking=args.blocking), os.path.join(args.out, "top_matches"), args.format)
+    print(f"wrote {os.path.join(args.out, 'metrics.json')} and {written}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,127 @@
+"""Metrics history: one compact row per data version, in daily Parquet partitions.
+
+Every refresh that loads a new data version appends its headline counts and
+per-stage counts::
+
+    .metrics_history/date=2026-10-17/<loaded at>-<version>.parquet
+
+A row is appended only when the version differs from the last one recorded,
+so refreshes of unchanged data add nothing, while data that changes back to
+an earlier version (A → B → A) is recorded again. Reads go through
+a pyarrow dataset filtered on the ``date`` partition, so a date range only
+opens that range's files however many years of history there are.
+"""
+import glob
+import os
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from pipeline import IN_TRAINING_STAGES, STAGES
+
+HISTORY_DIR = os.environ.get(
+    "METRICS_HISTORY_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".metrics_history"),
+)
+
+COUNT_COLUMNS = ["Total Candidates", "Open Positions", "In Training"] + STAGES
+HISTORY_SCHEMA = pa.schema(
+    [("version", pa.string()), ("loaded_at", pa.timestamp("us"))]
+    + [(col, pa.int32()) for col in COUNT_COLUMNS]
+)
+PARTITIONING = ds.partitioning(pa.schema([("date", pa.string())]), flavor="hive")
+
+
+def local_time(value):
+    """``value`` as a naive local timestamp, like ``pd.Timestamp.now()``; aware ones are converted first."""
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is not None:
+        ts = pd.Timestamp(datetime.fromtimestamp(ts.timestamp()))
+    return ts
+
+
+def local_today():
+    """Today's date in local time, the day the next appended row is filed under."""
+    return pd.Timestamp.now().date()
+
+
+def history_row(data):
+    """The history columns for one load's result."""
+    df = data["df"]
+    stage_counts = df["Stage"].value_counts() if "Stage" in df.columns else pd.Series(dtype=int)
+    row = {
+        "version": data["version"],
+        "loaded_at": local_time(data["loaded_at"]),
+        "Total Candidates": data["metrics"]["Total Candidates"],
+        "Open Positions": data["metrics"]["Open Positions"],
+        "In Training": int(stage_counts.reindex(IN_TRAINING_STAGES, fill_value=0).sum()),
+    }
+    row.update({stage: int(stage_counts.get(stage, 0)) for stage in STAGES})
+    return row
+
+
+def _day(value):
+    return local_time(value).strftime("%Y-%m-%d")
+
+
+class MetricsHistory:
+    def __init__(self, history_dir=HISTORY_DIR):
+        self.history_dir = history_dir
+
+    def last_version(self):
+        """Version of the most recently recorded row, or None."""
+        # File names start with the load time, so the newest day's last name is the latest row
+        for day_dir in sorted(glob.glob(os.path.join(glob.escape(self.history_dir), "date=*")), reverse=True):
+            names = sorted(name for name in os.listdir(day_dir) if name.endswith(".parquet") and not name.startswith("."))
+            if names:
+                return names[-1][:-len(".parquet")].split("-", 1)[1]
+        return None
+
+    def append(self, data):
+        """Record ``data`` unless its version is the last one recorded. Returns True if it wrote."""
+        version = data["version"]
+        if self.last_version() == version:
+            return False
+        row = history_row(data)
+        day_dir = os.path.join(self.history_dir, f"date={_day(row['loaded_at'])}")
+        os.makedirs(day_dir, exist_ok=True)
+        table = pa.Table.from_pylist([row], schema=HISTORY_SCHEMA)
+        name = f"{row['loaded_at']:%Y%m%dT%H%M%S%f}-{version}.parquet"
+        # Dot-prefixed until complete, so readers skip it
+        tmp = os.path.join(day_dir, f".{name}.tmp")
+        pq.write_table(table, tmp)
+        os.replace(tmp, os.path.join(day_dir, name))
+        return True
+
+    def read(self, start=None, end=None, columns=None):
+        """History rows loaded between the ``start`` and ``end`` dates (inclusive), oldest first."""
+        columns = ["version", "loaded_at"] + (COUNT_COLUMNS if columns is None else list(columns))
+        if not os.path.isdir(self.history_dir):
+            return HISTORY_SCHEMA.empty_table().select(columns).to_pandas()
+        dataset = ds.dataset(
+            self.history_dir, schema=HISTORY_SCHEMA.append(pa.field("date", pa.string())),
+            format="parquet", partitioning=PARTITIONING,
+        )
+        # Filters on the partition key prune whole days before any file is opened
+        condition = None
+        if start is not None:
+            condition = ds.field("date") >= _day(start)
+        if end is not None:
+            upper = ds.field("date") <= _day(end)
+            condition = upper if condition is None else condition & upper
+        table = dataset.to_table(columns=columns, filter=condition)
+        return table.to_pandas().sort_values("loaded_at", kind="stable").reset_index(drop=True)
+
+
+def record_history(data, history_dir=HISTORY_DIR):
+    """``MetricsHistory.append`` for a refresh: failures become a notice instead of failing the load."""
+    if data["df"].empty or not history_dir:
+        return data
+    try:
+        MetricsHistory(history_dir).append(data)
+    except Exception as e:
+        data["notices"].append(("warning", f"⚠️ Metrics history could not be updated: {e}"))
+    return data
@@ -0,0 +1,147 @@
+"""Incremental top-k rescoring between data loads.
+
+A pair's score depends only on that candidate's and that job's feature
+rows, so after a refresh most of the previous ranking still holds. Rows of
+both feature tables are hashed and matched against the previous load:
+
+* a candidate whose row is unchanged, and none of whose previous top ``k``
+  jobs was removed or changed, only needs scoring against the added or
+  changed jobs, merged into its previous top ``k``;
+* new or changed candidates, and those that lost a top job, are rescored
+  against every job.
+
+The same works with the sides swapped for each job's top candidates. The
+result is exactly what a full rescore gives, ties included.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from blocking import blocked_top_job_indices
+from matching import _total_score, subscore_matrices, top_candidate_indices, top_job_indices, top_k_indices
+
+# A ranking that can be updated next load: the row and column hashes it was
+# built from and, per row, the best ``k`` column positions and their scores
+TopK = namedtuple("TopK", ["row_hashes", "col_hashes", "cols", "scores", "k"])
+
+
+def row_hashes(feats):
+    return pd.util.hash_pandas_object(feats, index=False).to_numpy()
+
+
+def _previous_positions(old_hashes, new_hashes):
+    """For each new row, the old row with the same hash, or -1.
+
+    Identical rows are paired up in order, so duplicates match one to one.
+    """
+    old = pd.DataFrame({"hash": old_hashes, "pos": np.arange(len(old_hashes))})
+    old["n"] = old.groupby("hash").cumcount()
+    new = pd.DataFrame({"hash": new_hashes})
+    new["n"] = new.groupby("hash").cumcount()
+    return new.merge(old, on=["hash", "n"], how="left")["pos"].fillna(-1).to_numpy(dtype=np.intp)
+
+
+def update_top_k(previous, rows, cols, score, full, k, block_size=512):
+    """Best ``k`` columns per row, reusing ``previous`` (a ``TopK`` or None).
+
+    ``rows``/``cols`` are the current row and column hashes. ``score(r, c)``
+    returns the totals for row positions ``r`` × column positions ``c``;
+    ``full()`` ranks everything from scratch and is used when nothing can be
+    reused. Returns ``(TopK, stats)`` where ``stats`` counts the reused,
+    merged and rescored rows.
+    """
+    n_rows, n_cols = len(rows), len(cols)
+    stats = {"rows": n_rows, "reused": 0, "merged": 0, "rescored": n_rows, "added_cols": n_cols}
+
+    old_col_of_new = None
+    if previous is not None and previous.k == k:
+        old_col_of_new = _previous_positions(previous.col_hashes, cols)
+        kept = old_col_of_new[old_col_of_new >= 0]
+        # Ties go to the earlier column, so reuse needs unchanged columns to keep their order
+        if np.any(np.diff(kept) <= 0):
+            old_col_of_new = None
+    if old_col_of_new is None:
+        best_cols, best_scores = full()
+        return TopK(rows, cols, best_cols, best_scores, k), stats
+
+    new_col_of_old = np.full(len(previous.col_hashes), -1, dtype=np.intp)
+    new_col_of_old[old_col_of_new[old_col_of_new >= 0]] = np.flatnonzero(old_col_of_new >= 0)
+    added = np.flatnonzero(old_col_of_new < 0)
+
+    old_row = _previous_positions(previous.row_hashes, rows)
+    # Each row's previous top columns at their new positions; -1 for new rows and dropped columns
+    mapped = np.full((n_rows, previous.cols.shape[1]), -1, dtype=np.intp)
+    seen = old_row >= 0
+    mapped[seen] = new_col_of_old[previous.cols[old_row[seen]]]
+    lost_top = (mapped < 0).any(axis=1)
+    merge_rows = np.flatnonzero((old_row >= 0) & ~lost_top)
+    rescore_rows = np.flatnonzero((old_row < 0) | lost_top)
+
+    k_eff = min(k, n_cols)
+    best_cols = np.empty((n_rows, k_eff), dtype=np.intp)
+    best_scores = np.empty((n_rows, k_eff))
+
+    if len(merge_rows) and len(added):
+        for start in range(0, len(merge_rows), block_size):
+            block = merge_rows[start:start + block_size]
+            positions = np.concatenate([mapped[block], np.broadcast_to(added, (len(block), len(added)))], axis=1)
+            scores = np.concatenate([previous.scores[old_row[block]], score(block, added)], axis=1)
+            # Put the candidates back in column order so ties resolve as in a full rescore
+            order = np.argsort(positions, axis=1, kind="stable")
+            positions = np.take_along_axis(positions, order, axis=1)
+            scores = np.take_along_axis(scores, order, axis=1)
+            top = top_k_indices(scores, k)
+            best_cols[block] = np.take_along_axis(positions, top, axis=1)
+            best_scores[block] = np.take_along_axis(scores, top, axis=1)
+    elif len(merge_rows):
+        best_cols[merge_rows] = mapped[merge_rows]
+        best_scores[merge_rows] = previous.scores[old_row[merge_rows]]
+
+    every_col = np.arange(n_cols)
+    for start in range(0, len(rescore_rows), block_size):
+        block = rescore_rows[start:start + block_size]
+        totals = score(block, every_col)
+        top = top_k_indices(totals, k)
+        best_cols[block] = top
+        best_scores[block] = np.take_along_axis(totals, top, axis=1)
+
+    stats.update(
+        reused=len(merge_rows) if not len(added) else 0,
+        merged=len(merge_rows) if len(added) else 0,
+        rescored=len(rescore_rows),
+        added_cols=len(added),
+    )
+    return TopK(rows, cols, best_cols, best_scores, k), stats
+
+
+def update_rankings(previous, cand_feats, job_feats, k, workers=None, blocking=False):
+    """Each candidate's top ``k`` jobs and each job's top ``k`` candidates.
+
+    ``previous`` is the ``(top_jobs, top_candidates)`` pair from the last load
+    (or None). Returns the new pair and the stats of each side. ``blocking``
+    ranks candidates from scratch with ``blocked_top_job_indices`` instead of
+    scoring every pair.
+    """
+    prev_jobs, prev_cands = previous or (None, None)
+    cand_hashes, job_hashes = row_hashes(cand_feats), row_hashes(job_feats)
+
+    def cand_side(rows, cols):
+        return _total_score(subscore_matrices(cand_feats.iloc[rows], job_feats.iloc[cols]))
+
+    def job_side(rows, cols):
+        return cand_side(cols, rows).T
+
+    def all_jobs():
+        if blocking:
+            return blocked_top_job_indices(cand_feats, job_feats, k)
+        return top_job_indices(cand_feats, job_feats, k, workers=workers)
+
+    top_jobs, job_stats = update_top_k(
+        prev_jobs, cand_hashes, job_hashes, cand_side, all_jobs, k,
+    )
+    top_cands, cand_stats = update_top_k(
+        prev_cands, job_hashes, cand_hashes, job_side,
+        lambda: top_candidate_indices(cand_feats, job_feats, k), k,
+    )
+    return (top_jobs, top_cands), {"candidates": job_stats, "jobs": cand_stats}
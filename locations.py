@@ -0,0 +1,142 @@
+"""Location index: canonical city/state keys and coordinates.
+
+Candidate "Location" cells ("Seattle, WA", "Seattle", "seattle wa",
+"Texas") and job "City"/"State" cells are parsed into a lower-case
+city key and a two-letter state key, then looked up in the bundled offline
+gazetteer (``gazetteer.csv``: large US cities with their coordinates). A
+city given without a state resolves to the most populous gazetteer city of
+that name. Locations the gazetteer doesn't know keep their parsed keys and
+get no coordinates, so scoring falls back to comparing keys for them.
+"""
+import functools
+import os
+
+import numpy as np
+import pandas as pd
+
+GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gazetteer.csv")
+
+EARTH_RADIUS_MILES = 3958.8
+
+STATE_NAMES = {
+    "alabama": "al", "alaska": "ak", "arizona": "az", "arkansas": "ar", "california": "ca",
+    "colorado": "co", "connecticut": "ct", "delaware": "de", "district of columbia": "dc",
+    "florida": "fl", "georgia": "ga", "hawaii": "hi", "idaho": "id", "illinois": "il",
+    "indiana": "in", "iowa": "ia", "kansas": "ks", "kentucky": "ky", "louisiana": "la",
+    "maine": "me", "maryland": "md", "massachusetts": "ma", "michigan": "mi", "minnesota": "mn",
+    "mississippi": "ms", "missouri": "mo", "montana": "mt", "nebraska": "ne", "nevada": "nv",
+    "new hampshire": "nh", "new jersey": "nj", "new mexico": "nm", "new york": "ny",
+    "north carolina": "nc", "north dakota": "nd", "ohio": "oh", "oklahoma": "ok", "oregon": "or",
+    "pennsylvania": "pa", "rhode island": "ri", "south carolina": "sc", "south dakota": "sd",
+    "tennessee": "tn", "texas": "tx", "utah": "ut", "vermont": "vt", "virginia": "va",
+    "washington": "wa", "west virginia": "wv", "wisconsin": "wi", "wyoming": "wy",
+}
+STATE_CODES = set(STATE_NAMES.values())
+
+
+def _clean(text):
+    """Lower-case, drop periods, collapse whitespace and spell "saint" as "st"."""
+    return (
+        pd.Series(text, dtype=object).fillna("").astype(str).str.lower()
+        .str.replace(".", "", regex=False)
+        .str.replace(r"\s+", " ", regex=True).str.strip()
+        .str.replace(r"^saint ", "st ", regex=True)
+    )
+
+
+def state_key(text):
+    """Two-letter state key for state names or codes; "" for anything else."""
+    cleaned = _clean(text)
+    return cleaned.map(STATE_NAMES).fillna(cleaned.where(cleaned.isin(STATE_CODES), "")).to_numpy(dtype=object)
+
+
+def parse_locations(text):
+    """Split free-form locations into ``(city_key, state_key)`` arrays.
+
+    Handles "City, ST", "City, State", "City ST" and a bare state. A bare
+    name that is also a gazetteer city ("New York", "Washington") is read as
+    the city. Text after the last comma that isn't a state is dropped
+    ("Seattle, USA").
+    """
+    cleaned = _clean(text)
+    city = cleaned.copy()
+    state = pd.Series("", index=cleaned.index, dtype=object)
+
+    # A bare state name or code, unless it names a city too
+    bare = pd.Series(state_key(cleaned), index=cleaned.index)
+    is_state = (bare != "") & ~cleaned.isin(load_gazetteer()["city_key"])
+    state[is_state] = bare[is_state]
+    city[is_state] = ""
+
+    # "City, State" / "City, ST"
+    parts = cleaned.str.rsplit(",", n=1, expand=True).reindex(columns=[0, 1])
+    has_comma = ~is_state & parts[1].notna()
+    tail = pd.Series(state_key(parts[1].fillna("")), index=cleaned.index)
+    city[has_comma] = parts.loc[has_comma, 0].str.strip()
+    state[has_comma] = tail[has_comma]
+
+    # "City ST"
+    words = cleaned.str.rsplit(" ", n=1, expand=True).reindex(columns=[0, 1])
+    spaced = ~is_state & ~has_comma & words[1].isin(STATE_CODES)
+    city[spaced] = words.loc[spaced, 0]
+    state[spaced] = words.loc[spaced, 1]
+    return city.to_numpy(dtype=object), state.to_numpy(dtype=object)
+
+
+@functools.lru_cache(maxsize=None)
+def load_gazetteer(path=GAZETTEER_PATH):
+    """Gazetteer rows keyed like parsed locations, most populous city first."""
+    gazetteer = pd.read_csv(path, dtype={"city": str, "state": str})
+    return pd.DataFrame({
+        "city_key": _clean(gazetteer["city"]).to_numpy(dtype=object),
+        "state_key": gazetteer["state"].str.lower().to_numpy(dtype=object),
+        "lat": gazetteer["lat"].to_numpy(dtype=float),
+        "lon": gazetteer["lon"].to_numpy(dtype=float),
+    })
+
+
+def resolve_locations(city, state, gazetteer=None):
+    """Canonical keys and coordinates for parsed ``city``/``state`` arrays.
+
+    Returns a frame with ``city_key``, ``state_key`` (filled in from the
+    gazetteer when only the city was given), ``lat``/``lon`` (NaN when the
+    city isn't in the gazetteer) and ``resolved``.
+    """
+    gazetteer = load_gazetteer() if gazetteer is None else gazetteer
+    query = pd.DataFrame({"city_key": city, "state_key": state})
+    exact = query.merge(gazetteer.drop_duplicates(["city_key", "state_key"]), on=["city_key", "state_key"], how="left")
+    by_city = query[["city_key"]].merge(gazetteer.drop_duplicates("city_key"), on="city_key", how="left")
+
+    city_only = (query["state_key"] == "").to_numpy() & by_city["lat"].notna().to_numpy()
+    lat = np.where(city_only, by_city["lat"], exact["lat"])
+    lon = np.where(city_only, by_city["lon"], exact["lon"])
+    return pd.DataFrame({
+        "city_key": query["city_key"].to_numpy(dtype=object),
+        "state_key": np.where(city_only, by_city["state_key"], query["state_key"]).astype(object),
+        "lat": lat.astype(float),
+        "lon": lon.astype(float),
+        "resolved": ~np.isnan(lat.astype(float)),
+    })
+
+
+def unit_vectors(lat, lon):
+    """Points on the unit sphere, one row per location (NaN rows for unresolved ones)."""
+    lat, lon = np.radians(lat), np.radians(lon)
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+
+def within_miles_threshold(miles):
+    """Dot-product threshold of two ``unit_vectors`` rows at most ``miles`` apart.
+
+    The great-circle (haversine) distance grows as the dot product shrinks, so
+    ``dot >= within_miles_threshold(d)`` is the same test as ``distance <= d``
+    without any trigonometry per pair.
+    """
+    return np.cos(miles / EARTH_RADIUS_MILES)
+
+
+def unresolved_summary(labels, resolved, limit=5):
+    """``(count, examples)`` of distinct non-blank labels whose location wasn't resolved."""
+    labels = pd.Series(labels, dtype=object).fillna("").astype(str).str.strip()
+    missing = labels[~np.asarray(resolved) & (labels != "")].drop_duplicates()
+    return len(missing), missing.head(limit).tolist()
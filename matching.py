@@ -0,0 +1,513 @@
+"""Candidate–job match scoring for the Placement Readiness Breakdown.
+
+Everything that depends on only one side of a pair (normalized keys,
+resolved locations, keyword flags, confidence tier, readiness, salary
+midpoint) is extracted
+once per data load into compact candidate and job feature tables. The
+scorer reads only those tables and computes every subscore as a NumPy array
+over the candidate × job grid. Very large grids are split into candidate
+shards and scored by a process pool over shared-memory copies of the
+encoded features.
+"""
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from locations import parse_locations, resolve_locations, state_key, unit_vectors, within_miles_threshold
+from pipeline import EXPERIENCE_KEYWORDS, normalize_salary
+
+EXPERIENCE_FLAGS = ["amazon", "aviation"]
+SUBSCORES = ["Vertical", "Salary", "Geo", "Confidence", "Readiness"]
+
+# Confidence tiers in the order they are checked, with their subscores
+CONFIDENCE_TIERS = [("high", 15), ("mod", 10), ("low", 5)]
+DEFAULT_CONFIDENCE_SCORE = 10
+
+# Geo subscore by great-circle distance (miles) between resolved locations,
+# checked in order. The same city counts as the nearest band and the same
+# state as at least 10 even when a side couldn't be placed on the map.
+GEO_DISTANCE_BANDS = [(25, 20), (100, 15), (250, 10)]
+SAME_CITY_GEO_SCORE = 20
+SAME_STATE_GEO_SCORE = 10
+DEFAULT_GEO_SCORE = 5
+
+
+# ---- Per-side helpers ----
+def _text(df, col):
+    """``str(row.get(col, ""))`` for every row, as an object Series."""
+    if col not in df.columns:
+        return pd.Series("", index=df.index, dtype=object)
+    return df[col].astype(object).map(str)
+
+
+def _raw(df, col):
+    """``df[col]`` as objects, or blanks when the column is missing."""
+    if col not in df.columns:
+        return pd.Series("", index=df.index, dtype=object)
+    return df[col].astype(object)
+
+
+def _first_truthy(df, cols, default="—"):
+    """``row.get(cols[0]) or row.get(cols[1]) or ... or default`` for every row."""
+    out = pd.Series(default, index=df.index, dtype=object)
+    for col in reversed(cols):
+        if col in df.columns:
+            vals = df[col].astype(object)
+            out = vals.where(vals.map(bool), out)
+    return out
+
+
+def _salary_mid(df):
+    # "Salary Mid" is normally added at load time; normalize here for frames that skipped it
+    if "Salary Mid" in df.columns:
+        return pd.to_numeric(df["Salary Mid"], errors="coerce").to_numpy(dtype=float)
+    if "Salary" not in df.columns:
+        return np.full(len(df), np.nan)
+    return normalize_salary(df["Salary"])["Salary Mid"].to_numpy(dtype=float)
+
+
+def _shared_codes(left, right, blank_matches=True):
+    """Factorize two Series against one vocabulary so equality is an int compare.
+
+    With ``blank_matches`` off, "" gets code -1 and matches nothing.
+    """
+    values = pd.concat([pd.Series(left, dtype=object), pd.Series(right, dtype=object)], ignore_index=True)
+    if not blank_matches:
+        values = values.mask(values == "")
+    codes, _ = pd.factorize(values)
+    return codes[: len(left)], codes[len(left):]
+
+
+def _locations(city, state):
+    """Location index columns (canonical keys and coordinates) for parsed keys."""
+    index = resolve_locations(city, state)
+    return {
+        "city_key": index["city_key"].to_numpy(),
+        "state_key": index["state_key"].to_numpy(),
+        "lat": index["lat"].to_numpy(),
+        "lon": index["lon"].to_numpy(),
+    }
+
+
+# ---- Feature tables ----
+def candidate_features(candidates_df):
+    """One row per candidate with everything the scorer needs from that side."""
+    n_cand = len(candidates_df)
+
+    exp_cols = [k for k in candidates_df.columns if any(x in k.lower() for x in EXPERIENCE_KEYWORDS)]
+    exp_flag = np.zeros(n_cand, dtype=bool)
+    if exp_cols:
+        exp_str = pd.concat([_text(candidates_df, k).str.lower() for k in exp_cols], axis=1).agg(" ".join, axis=1)
+        for word in EXPERIENCE_FLAGS:
+            exp_flag |= exp_str.str.contains(word, regex=False).to_numpy(dtype=bool)
+
+    conf = _text(candidates_df, "Confidence").str.lower()
+    tier_masks = [conf.str.contains(tier, regex=False).to_numpy(dtype=bool) for tier, _ in CONFIDENCE_TIERS]
+    conf_tier = np.select(tier_masks, [tier for tier, _ in CONFIDENCE_TIERS], default="")
+    conf_score = np.select(tier_masks, [score for _, score in CONFIDENCE_TIERS], default=DEFAULT_CONFIDENCE_SCORE)
+
+    if "Week" in candidates_df.columns:
+        week = candidates_df["Week"]
+        week_num = pd.to_numeric(week, errors="coerce").to_numpy(dtype=float)
+    else:
+        week = pd.Series(None, index=candidates_df.index, dtype=object)
+        week_num = np.full(n_cand, np.nan)
+    readiness = np.select([week_num >= 6, (week_num >= 1) & (week_num <= 5)], [10, week_num * 1.5], default=5)
+
+    if "Status" in candidates_df.columns:
+        status = candidates_df["Status"]
+    else:
+        status = pd.Series(None, index=candidates_df.index, dtype=object)
+    return pd.DataFrame({
+        "candidate": candidates_df["MIT Name"].to_numpy(),
+        "week": week.to_numpy(),
+        "status": status.to_numpy(),
+        "vert_key": _text(candidates_df, "VERT").str.strip().str.upper().to_numpy(),
+        "exp_flag": exp_flag,
+        "loc_key": _text(candidates_df, "Location").str.strip().str.lower().to_numpy(),
+        **_locations(*parse_locations(_raw(candidates_df, "Location"))),
+        "conf_tier": conf_tier,
+        "conf_score": conf_score,
+        "readiness": readiness.astype(float),
+        "salary_mid": _salary_mid(candidates_df),
+    })
+
+
+def job_features(jobs_df):
+    """One row per job with its match keys and the columns shown in results."""
+    vert_col = "VERT" if "VERT" in jobs_df.columns else "Vertical"
+    # City cells sometimes carry the state too ("Seattle, WA"); the State column wins
+    city, parsed_state = parse_locations(_raw(jobs_df, "City"))
+    state = state_key(_raw(jobs_df, "State"))
+    state = np.where(state != "", state, parsed_state)
+    return pd.DataFrame({
+        "account": _first_truthy(jobs_df, ["Account", "Job Account"]).to_numpy(),
+        "title": _first_truthy(jobs_df, ["Title", "Job Title"]).to_numpy(),
+        "city": jobs_df["City"].to_numpy() if "City" in jobs_df.columns else "",
+        "state": jobs_df["State"].to_numpy() if "State" in jobs_df.columns else "",
+        "vert": _first_truthy(jobs_df, ["VERT", "Vertical"]).to_numpy(),
+        "vert_key": _text(jobs_df, vert_col).str.strip().str.upper().to_numpy(),
+        **_locations(city, state),
+        "salary_mid": _salary_mid(jobs_df),
+    }, index=pd.RangeIndex(len(jobs_df)))
+
+
+# ---- Subscores ----
+def encode_features(cand_feats, job_feats):
+    """Numeric arrays holding everything the subscores read.
+
+    String keys become shared integer codes and coordinates become unit
+    vectors, so scoring only touches plain arrays. Candidate arrays (``c_*``) are row-aligned with
+    ``cand_feats`` and can be sliced into shards.
+    """
+    c_vert, j_vert = _shared_codes(cand_feats["vert_key"], job_feats["vert_key"])
+    c_city, j_city = _shared_codes(cand_feats["city_key"], job_feats["city_key"], blank_matches=False)
+    c_state, j_state = _shared_codes(cand_feats["state_key"], job_feats["state_key"], blank_matches=False)
+    return {
+        "c_vert": c_vert,
+        "c_exp": cand_feats["exp_flag"].to_numpy(dtype=bool),
+        "c_city": c_city,
+        "c_state": c_state,
+        "c_xyz": unit_vectors(cand_feats["lat"].to_numpy(dtype=float), cand_feats["lon"].to_numpy(dtype=float)),
+        "c_conf": cand_feats["conf_score"].to_numpy(dtype=float),
+        "c_readiness": cand_feats["readiness"].to_numpy(dtype=float),
+        "c_salary": cand_feats["salary_mid"].to_numpy(dtype=float),
+        "j_vert": j_vert,
+        "j_city": j_city,
+        "j_state": j_state,
+        "j_xyz": unit_vectors(job_feats["lat"].to_numpy(dtype=float), job_feats["lon"].to_numpy(dtype=float)),
+        "j_salary": job_feats["salary_mid"].to_numpy(dtype=float),
+    }
+
+
+def _candidate_rows(encoded, start, stop):
+    return {name: arr[start:stop] if name.startswith("c_") else arr for name, arr in encoded.items()}
+
+
+def _subscores(encoded):
+    n_jobs = len(encoded["j_vert"])
+
+    # 1) Vertical Alignment
+    exp_bonus = np.where(encoded["c_exp"], 10, 0)
+    vert = np.where(encoded["c_vert"][:, None] == encoded["j_vert"][None, :], 30, 0) + exp_bonus[:, None]
+
+    # 2) Salary Trajectory
+    c_sal = encoded["c_salary"][:, None]
+    j_sal = encoded["j_salary"][None, :]
+    # Missing or zero salaries on either side score 0
+    valid = (np.nan_to_num(c_sal) != 0) & (np.nan_to_num(j_sal) != 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sal = np.select(
+            [
+                valid & (j_sal >= 1.05 * c_sal),
+                valid & (np.abs(j_sal - c_sal) / c_sal <= 0.05),
+                valid & (j_sal < 0.95 * c_sal),
+            ],
+            [25, 15, -10],
+            default=0,
+        )
+
+    # 3) Geographic Fit: distance bands where both sides are on the map, else
+    # the canonical city/state keys (a city matches unless the states differ)
+    c_state, j_state = encoded["c_state"][:, None], encoded["j_state"][None, :]
+    same_state = (c_state == j_state) & (c_state >= 0)
+    same_city = (
+        (encoded["c_city"][:, None] == encoded["j_city"][None, :]) & (encoded["c_city"][:, None] >= 0)
+        & (same_state | (c_state < 0) | (j_state < 0))
+    )
+    # Dot products of unit vectors, NaN where a side is unresolved
+    closeness = encoded["c_xyz"] @ encoded["j_xyz"].T
+    with np.errstate(invalid="ignore"):
+        within = [closeness >= within_miles_threshold(miles) for miles, _ in GEO_DISTANCE_BANDS]
+    geo = np.select(
+        [same_city] + within + [same_state],
+        [SAME_CITY_GEO_SCORE] + [score for _, score in GEO_DISTANCE_BANDS] + [SAME_STATE_GEO_SCORE],
+        default=DEFAULT_GEO_SCORE,
+    )
+
+    # 4) Confidence and 5) Readiness only depend on the candidate
+    ones = np.ones((1, n_jobs))
+    return {
+        "Vertical": vert,
+        "Salary": sal,
+        "Geo": geo,
+        "Confidence": encoded["c_conf"][:, None] * ones,
+        "Readiness": encoded["c_readiness"][:, None] * ones,
+    }
+
+
+def subscore_matrices(cand_feats, job_feats):
+    """Return ``{subscore name: C×J array}`` for every candidate/job pair."""
+    return _subscores(encode_features(cand_feats, job_feats))
+
+
+def _total_score(subscores, weights=None):
+    if weights is None:
+        return np.round(sum(subscores[name] for name in SUBSCORES), 1)
+    return np.round(sum(float(weights[name]) * subscores[name] for name in SUBSCORES), 1)
+
+
+def _match_frame(cand_feats, job_feats, cand_idx, job_idx, total):
+    """Build match rows for the ``(cand_idx[i], job_idx[i])`` positional pairs."""
+    return pd.DataFrame({
+        "Candidate": cand_feats["candidate"].to_numpy()[cand_idx],
+        "Job Account": job_feats["account"].to_numpy()[job_idx],
+        "Title": job_feats["title"].to_numpy()[job_idx],
+        "City": job_feats["city"].to_numpy()[job_idx],
+        "State": job_feats["state"].to_numpy()[job_idx],
+        "VERT": job_feats["vert"].to_numpy()[job_idx],
+        "Total Score": total,
+        "Week": cand_feats["week"].to_numpy()[cand_idx],
+        "Status": cand_feats["status"].to_numpy()[cand_idx],
+    })
+
+
+def top_k_indices(scores, k):
+    """Column positions of the ``k`` best scores in each row, best first.
+
+    Uses ``argpartition``-style selection rather than a full sort. Ties are
+    broken by column position, so earlier jobs win.
+    """
+    n_rows, n_cols = scores.shape
+    k = min(k, n_cols)
+    if k <= 0:
+        return np.empty((n_rows, 0), dtype=np.intp)
+    kth = -np.partition(-scores, k - 1, axis=1)[:, k - 1:k]
+    above = scores > kth
+    ties = scores == kth
+    need = k - above.sum(axis=1, keepdims=True)
+    keep = above | (ties & (np.cumsum(ties, axis=1) <= need))
+    cols = np.nonzero(keep)[1].reshape(n_rows, k)
+    order = np.argsort(-np.take_along_axis(scores, cols, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(cols, order, axis=1)
+
+
+def _top_k_blocks(encoded, start, stop, k, block_size):
+    """Top ``k`` job positions and scores for candidate rows ``start:stop``, ``block_size`` rows at a time."""
+    col_blocks, score_blocks = [], []
+    for block_start in range(start, stop, block_size):
+        total = _total_score(_subscores(_candidate_rows(encoded, block_start, min(block_start + block_size, stop))))
+        cols = top_k_indices(total, k)
+        col_blocks.append(cols)
+        score_blocks.append(np.take_along_axis(total, cols, axis=1))
+    k_eff = max(min(k, len(encoded["j_vert"])), 0)
+    if not col_blocks:
+        return np.empty((0, k_eff), dtype=np.intp), np.empty((0, k_eff))
+    return np.concatenate(col_blocks), np.concatenate(score_blocks)
+
+
+# ---- Reweighting ----
+# Multiplier per subscore; all ones gives the standard total
+DEFAULT_WEIGHTS = dict.fromkeys(SUBSCORES, 1.0)
+# Subscores that depend on both sides of a pair, cached as one byte per pair each
+PAIR_SUBSCORES = ["Vertical", "Salary", "Geo"]
+# Grids larger than this keep only the encoded features and recompute pair subscores
+REWEIGHT_CACHE_MAX_PAIRS = 50_000_000
+
+
+class SubscoreCache:
+    """Every pair's subscores, kept so totals can be reweighted without rescoring.
+
+    Vertical, salary and geo only take a few small integer values and are
+    stored as C×J ``int8`` matrices; confidence and readiness depend only on
+    the candidate and stay vectors. A new weighting is then a weighted sum
+    over the cached arrays::
+
+        cache = SubscoreCache(cand_feats, job_feats)
+        cols, scores = cache.top_job_indices(3, {**DEFAULT_WEIGHTS, "Salary": 2.0})
+    """
+
+    def __init__(self, cand_feats, job_feats, block_size=512, max_pairs=REWEIGHT_CACHE_MAX_PAIRS):
+        self.encoded = encode_features(cand_feats, job_feats)
+        self.n_candidates, self.n_jobs = len(cand_feats), len(job_feats)
+        self.matrices = None
+        if self.n_candidates * self.n_jobs <= max_pairs:
+            self.matrices = {name: np.empty((self.n_candidates, self.n_jobs), dtype=np.int8) for name in PAIR_SUBSCORES}
+            for start in range(0, self.n_candidates, block_size):
+                stop = min(start + block_size, self.n_candidates)
+                block = _subscores(_candidate_rows(self.encoded, start, stop))
+                for name in PAIR_SUBSCORES:
+                    self.matrices[name][start:stop] = block[name]
+
+    def totals(self, weights=None, start=0, stop=None):
+        """Weighted totals for candidate rows ``start:stop`` against every job."""
+        stop = self.n_candidates if stop is None else stop
+        weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        if self.matrices is None:
+            return _total_score(_subscores(_candidate_rows(self.encoded, start, stop)), weights)
+        subscores = {name: self.matrices[name][start:stop] for name in PAIR_SUBSCORES}
+        subscores["Confidence"] = self.encoded["c_conf"][start:stop, None]
+        subscores["Readiness"] = self.encoded["c_readiness"][start:stop, None]
+        return _total_score(subscores, weights)
+
+    def top_job_indices(self, k=3, weights=None, block_size=512):
+        """Like ``top_job_indices``, with each subscore multiplied by its weight."""
+        col_blocks, score_blocks = [], []
+        for start in range(0, self.n_candidates, block_size):
+            total = self.totals(weights, start, min(start + block_size, self.n_candidates))
+            cols = top_k_indices(total, k)
+            col_blocks.append(cols)
+            score_blocks.append(np.take_along_axis(total, cols, axis=1))
+        if not col_blocks:
+            k_eff = max(min(k, self.n_jobs), 0)
+            return np.empty((0, k_eff), dtype=np.intp), np.empty((0, k_eff))
+        return np.concatenate(col_blocks), np.concatenate(score_blocks)
+
+
+# ---- Sharded scoring ----
+# Grids at least this big are scored across a process pool. Below it,
+# starting the workers costs more than they save.
+POOL_MIN_PAIRS = 50_000_000
+# Shards per worker, so a slow shard doesn't leave the other workers idle
+SHARDS_PER_WORKER = 2
+
+
+def default_workers(n_pairs):
+    """How many processes to score ``n_pairs`` pairs with (1 means in-process)."""
+    if n_pairs < POOL_MIN_PAIRS:
+        return 1
+    return os.cpu_count() or 1
+
+
+def _share(encoded):
+    """Copy the encoded arrays into shared memory; return the segments and how to reattach them."""
+    segments, layout = [], {}
+    for name, arr in encoded.items():
+        arr = np.ascontiguousarray(arr)
+        shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+        segments.append(shm)
+        np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+        layout[name] = (shm.name, arr.shape, arr.dtype.str)
+    return segments, layout
+
+
+def _attach(name):
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # Spawned workers share the parent's resource tracker, which already
+    # tracks the segment, so attaching doesn't register a second owner
+    return shared_memory.SharedMemory(name=name)
+
+
+def _score_shard(layout, start, stop, k, block_size):
+    """Worker entry point: score candidate rows ``start:stop`` from shared memory."""
+    segments = {name: _attach(shm_name) for name, (shm_name, _, _) in layout.items()}
+    try:
+        encoded = {
+            name: np.ndarray(shape, dtype=dtype, buffer=segments[name].buf)
+            for name, (_, shape, dtype) in layout.items()
+        }
+        result = _top_k_blocks(encoded, start, stop, k, block_size)
+        del encoded
+        return result
+    finally:
+        for shm in segments.values():
+            shm.close()
+
+
+def _pooled_top_k(encoded, k, block_size, workers):
+    n_cand = len(encoded["c_vert"])
+    shard_size = -(-n_cand // (workers * SHARDS_PER_WORKER))
+    shard_size = -(-shard_size // block_size) * block_size
+    bounds = [(start, min(start + shard_size, n_cand)) for start in range(0, n_cand, shard_size)]
+
+    segments, layout = _share(encoded)
+    try:
+        # spawn rather than fork: the page's refresh thread may be running
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(workers, len(bounds)), mp_context=context) as pool:
+            shards = list(pool.map(_score_shard, *zip(*[(layout, start, stop, k, block_size) for start, stop in bounds])))
+    finally:
+        for shm in segments:
+            shm.close()
+            shm.unlink()
+    return np.concatenate([cols for cols, _ in shards]), np.concatenate([scores for _, scores in shards])
+
+
+def top_job_indices(cand_feats, job_feats, k=3, block_size=512, workers=None):
+    """Positions and scores of each candidate's best ``k`` jobs, as two C×k arrays, best first.
+
+    Large grids are split into candidate shards scored by ``workers``
+    processes that read the encoded features from shared memory; by default
+    ``default_workers`` decides from the grid size. Results are the same
+    either way.
+    """
+    encoded = encode_features(cand_feats, job_feats)
+    n_cand = len(cand_feats)
+    if workers is None:
+        workers = default_workers(n_cand * len(job_feats))
+    if workers > 1 and n_cand > block_size:
+        return _pooled_top_k(encoded, k, block_size, workers)
+    return _top_k_blocks(encoded, 0, n_cand, k, block_size)
+
+
+def top_matches(cand_feats, job_feats, k=3, block_size=512, workers=None):
+    """Best ``k`` jobs for each candidate.
+
+    Candidates are scored ``block_size`` at a time and only the top ``k`` of
+    each block are kept, so memory grows with C×k rather than C×J. Rows come
+    back candidate-major in input order with a 1-based ``Rank`` per candidate.
+    See ``top_job_indices`` for ``workers``.
+    """
+    cols, scores = top_job_indices(cand_feats, job_feats, k, block_size, workers)
+    return ranked_matches(cand_feats, job_feats, cols, scores)
+
+
+def ranked_matches(cand_feats, job_feats, cols, scores, k=None, rows=None):
+    """``top_matches`` rows from precomputed best-first job positions and scores.
+
+    ``cols``/``scores`` are C×n arrays such as ``top_job_indices`` returns.
+    ``k`` keeps each candidate's first ``k`` (a top-``k`` is a prefix of a
+    longer ranking) and ``rows`` picks candidate positions to include.
+    """
+    if k is not None:
+        cols, scores = cols[:, :k], scores[:, :k]
+    if rows is None:
+        rows = np.arange(len(cols))
+    else:
+        cols, scores = cols[rows], scores[rows]
+    cand_idx = np.repeat(rows, cols.shape[1])
+    match_df = _match_frame(cand_feats, job_feats, cand_idx, cols.ravel(), scores.ravel())
+    match_df["Rank"] = np.tile(np.arange(1, cols.shape[1] + 1), len(rows))
+    return match_df
+
+
+def top_candidate_indices(cand_feats, job_feats, k=3, block_size=512):
+    """Positions and scores of each job's best ``k`` candidates, as two J×k arrays, best first.
+
+    Each block of candidates is merged into a running top ``k`` per job, so
+    memory stays at one block plus J×k. Ties go to the earlier candidate.
+    """
+    encoded = encode_features(cand_feats, job_feats)
+    n_cand, n_jobs = len(cand_feats), len(job_feats)
+    best_rows = np.empty((n_jobs, 0), dtype=np.intp)
+    best_scores = np.empty((n_jobs, 0))
+    for start in range(0, n_cand, block_size):
+        stop = min(start + block_size, n_cand)
+        total = _total_score(_subscores(_candidate_rows(encoded, start, stop)))
+        # Running best come first, so ties keep favouring earlier candidates
+        rows = np.concatenate([best_rows, np.broadcast_to(np.arange(start, stop), (n_jobs, stop - start))], axis=1)
+        scores = np.concatenate([best_scores, total.T], axis=1)
+        cols = top_k_indices(scores, k)
+        best_rows = np.take_along_axis(rows, cols, axis=1)
+        best_scores = np.take_along_axis(scores, cols, axis=1)
+    return best_rows, best_scores
+
+
+def order_by_readiness(match_df):
+    """Ready candidates first, then by week, then by each candidate's best score.
+
+    Each candidate's matches stay together and keep their rank order.
+    """
+    best = match_df.groupby("Candidate", sort=False)["Total Score"].transform("max")
+    order = pd.DataFrame({
+        "is_ready": (match_df["Week"] >= 6).astype(int),
+        "Week": match_df["Week"],
+        "Best Score": best,
+    }).sort_values(["is_ready", "Week", "Best Score"], ascending=[False, False, False], kind="stable").index
+    return match_df.loc[order]
@@ -0,0 +1,96 @@
+"""Lightweight per-stage timing spans, logged as JSON lines.
+
+    timings = Timings("render")
+    with timings.span("score", pairs=12000):
+        ...
+    timings.spans  # [{"scope": "render", "stage": "score", "ms": 41.2, "pairs": 12000}]
+
+Script-style code can use ``timings.lap("chart")`` instead, which records
+the time since the previous lap. A disabled ``Timings`` hands out one shared
+no-op context manager and returns from ``lap`` immediately, so instrumented
+code costs next to nothing when nobody is looking.
+
+``memory_report`` breaks down how much memory loaded frames hold, column by
+column.
+"""
+import contextlib
+import json
+import logging
+import sys
+import time
+
+import pandas as pd
+
+logger = logging.getLogger("mit_dashboard.perf")
+if not logger.handlers:
+    _handler = logging.StreamHandler(sys.stderr)
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+_NO_SPAN = contextlib.nullcontext()
+
+
+class _Span:
+    __slots__ = ("timings", "name", "fields", "start")
+
+    def __init__(self, timings, name, fields):
+        self.timings = timings
+        self.name = name
+        self.fields = fields
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        ms = (time.perf_counter() - self.start) * 1000
+        self.timings.record(self.name, ms, **self.fields)
+        return False
+
+
+class Timings:
+    def __init__(self, scope, enabled=True):
+        self.scope = scope
+        self.enabled = enabled
+        self.spans = []
+        self._last = time.perf_counter()
+
+    def span(self, name, **fields):
+        """Time the ``with`` block as stage ``name``; ``fields`` are logged alongside."""
+        if not self.enabled:
+            return _NO_SPAN
+        return _Span(self, name, fields)
+
+    def lap(self, name, **fields):
+        """Record the time since the previous lap (or since creation) as stage ``name``."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.record(name, (now - self._last) * 1000, **fields)
+        self._last = now
+
+    def record(self, name, ms, **fields):
+        entry = {"scope": self.scope, "stage": name, "ms": round(ms, 3), **fields}
+        self.spans.append(entry)
+        logger.info(json.dumps(entry, default=str))
+
+    def total_ms(self):
+        return round(sum(s["ms"] for s in self.spans), 3)
+
+
+def memory_report(frames):
+    """Deep memory use of every column of every frame in ``{name: frame}``.
+
+    One row per column (plus each frame's index) with its dtype and bytes;
+    ``None`` frames are skipped.
+    """
+    rows = []
+    for name, df in frames.items():
+        if df is None:
+            continue
+        for col, nbytes in df.memory_usage(deep=True).items():
+            dtype = "index" if col == "Index" and col not in df.columns else str(df[col].dtype)
+            rows.append({"frame": name, "column": str(col), "dtype": dtype, "bytes": int(nbytes)})
+    return pd.DataFrame(rows, columns=["frame", "column", "dtype", "bytes"])
@@ -0,0 +1,387 @@
+"""Headless loading, cleaning and classification of the dashboard sheets.
+
+Nothing here imports Streamlit. Loaders report problems by appending
+``(level, message)`` pairs to a ``notices`` list that the caller renders.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from sheets import STALE, Sheet
+
+
+def calc_weeks(df, today=None):
+    """Weeks in program for every row, computed column-wise.
+
+    Rows with a "Start Date" use it: a start in the past is week
+    ``days // 7 + 1``, a start in the future gives negative weeks until it
+    begins. Rows without a usable start date fall back to the numeric "Week"
+    column. ``today`` defaults to now and can be pinned for reproducible runs.
+    """
+    today = pd.Timestamp.now() if today is None else pd.Timestamp(today)
+
+    if "Start Date" in df.columns:
+        start = pd.to_datetime(df["Start Date"], errors="coerce")
+        future = start > today
+        days_until = (start - today).dt.days
+        days_since = (today - start).dt.days
+        calculated = pd.Series(
+            np.where(future, -(days_until // 7), days_since // 7 + 1),
+            index=df.index,
+            dtype=float,
+        ).where(start.notna())
+    else:
+        calculated = pd.Series(np.nan, index=df.index)
+
+    if "Week" in df.columns:
+        calculated = calculated.where(calculated.notna(), pd.to_numeric(df["Week"], errors="coerce"))
+    return pd.to_numeric(calculated, errors="coerce")
+
+
+
+# ---- Salary normalization ----
+# "70000", "70.5k", "70k-75k" once "$", "," and whitespace are gone and dashes are unified
+_SALARY_NUMBER = r"(\d+(?:\.\d*)?|\.\d+)(k?)"
+_SALARY_PATTERN = rf"^{_SALARY_NUMBER}(?:-{_SALARY_NUMBER})?$"
+
+SALARY_COLUMNS = ["Salary Low", "Salary High", "Salary Mid"]
+
+
+def normalize_salary(values):
+    """Numeric low, high and mid salary for every raw value.
+
+    Handles "$70,000", "70k", "70k-75k" and en/em dash or underscore ranges;
+    a single figure is its own low, high and mid. Each distinct raw value is
+    parsed once and the results are mapped back, and anything unparseable
+    is NaN.
+    """
+    values = pd.Series(values)
+    codes, uniques = pd.factorize(values)
+    text = (
+        pd.Series(uniques, dtype=object)
+        .astype(str)
+        .str.replace(r"[$,\s]", "", regex=True)
+        .str.lower()
+        .str.replace(r"[–—_]", "-", regex=True)
+    )
+    parts = text.str.extract(_SALARY_PATTERN)
+    low = pd.to_numeric(parts[0], errors="coerce") * np.where(parts[1] == "k", 1000, 1)
+    high = pd.to_numeric(parts[2], errors="coerce") * np.where(parts[3] == "k", 1000, 1)
+    high = high.where(parts[2].notna(), low)
+    parsed = np.column_stack([low, high, (low + high) / 2]).astype(float)
+
+    # factorize marks missing values with -1; point them at an all-NaN row
+    parsed = np.vstack([parsed, np.full((1, 3), np.nan)])
+    return pd.DataFrame(parsed[np.where(codes < 0, len(parsed) - 1, codes)], index=values.index, columns=SALARY_COLUMNS)
+
+# ---- Sheet schemas ----
+# One declared column: its canonical name, other headers it may appear under,
+# the dtype it is parsed as (None lets pandas infer it) and whether the sheet
+# is unusable without it
+Column = namedtuple("Column", ["name", "aliases", "dtype", "required"], defaults=((), None, False))
+
+# Free-text candidate columns scanned for prior experience keywords
+EXPERIENCE_KEYWORDS = ["experience", "notes", "background"]
+
+
+class SheetSchema:
+    """The columns a sheet is expected to have and how to parse them.
+
+    ``read_csv_kwargs()`` prunes undeclared columns and sets dtypes while the
+    CSV is parsed. ``conform`` renames aliases to canonical names and applies
+    the same pruning and dtypes to frames parsed some other way (e.g. older
+    snapshots), and reports which declared columns are missing.
+    Headers containing any of ``keep_containing`` are kept as they are, and
+    with ``keep_undeclared`` so is every other column except the ``drop``
+    headers and blank "Unnamed" ones.
+    """
+
+    def __init__(self, columns, keep_containing=(), keep_undeclared=False, drop=()):
+        self.columns = columns
+        self.keep_containing = keep_containing
+        self.keep_undeclared = keep_undeclared
+        self.drop = set(drop)
+        self._canonical = {}
+        for col in columns:
+            for header in (col.name, *col.aliases):
+                self._canonical[header.strip()] = col.name
+
+    def canonical(self, header):
+        """Canonical name for a raw header, or None if the column isn't wanted."""
+        header = str(header).strip()
+        if header in self._canonical:
+            return self._canonical[header]
+        if header in self.drop or header.startswith("Unnamed"):
+            return None
+        if self.keep_undeclared or any(word in header.lower() for word in self.keep_containing):
+            return header
+        return None
+
+    def _wanted(self, header):
+        return self.canonical(header) is not None
+
+    def categories(self):
+        return [col.name for col in self.columns if col.dtype == "category"]
+
+    def read_csv_kwargs(self):
+        dtypes = {}
+        for col in self.columns:
+            if col.dtype is not None:
+                for header in (col.name, *col.aliases):
+                    dtypes[header] = col.dtype
+        return {"usecols": self._wanted, "dtype": dtypes}
+
+    def conform(self, df):
+        """Return ``(df, missing_required, missing_optional)`` with canonical columns only."""
+        renames = {header: self.canonical(header) for header in df.columns}
+        df = df[[header for header, name in renames.items() if name is not None]]
+        df = df.set_axis([renames[header] for header in df.columns], axis=1)
+        # A sheet that has both a column and one of its aliases keeps the first
+        df = df.loc[:, ~df.columns.duplicated()]
+
+        missing_required, missing_optional = [], []
+        for col in self.columns:
+            if col.name not in df.columns:
+                (missing_required if col.required else missing_optional).append(col.name)
+            elif col.dtype == "category" and not isinstance(df[col.name].dtype, pd.CategoricalDtype):
+                df = df.assign(**{col.name: df[col.name].astype("category")})
+        return df, missing_required, missing_optional
+
+
+CANDIDATE_SCHEMA = SheetSchema(
+    [
+        Column("MIT Name", required=True),
+        Column("Status", dtype="category", required=True),
+        Column("Week", aliases=("Week ",)),
+        Column("Start Date", aliases=("Start date",)),
+        Column("Salary"),
+        Column("VERT", dtype="category"),
+        Column("Location", dtype="category"),
+        Column("Confidence", dtype="category"),
+        Column("Training Site", dtype="category"),
+        Column("Level", dtype="category"),
+    ],
+    keep_containing=EXPERIENCE_KEYWORDS,
+)
+
+# Every job column is shown in the Open Job Positions table, so undeclared ones
+# are kept; only "JV Link", "JV ID" and blank "Unnamed" columns are never parsed
+JOB_SCHEMA = SheetSchema(
+    [
+        Column("Job Title", aliases=("Title",), required=True),
+        Column("Account", aliases=("Job Account",), dtype="category"),
+        Column("VERT", aliases=("Vertical",), dtype="category"),
+        Column("City", dtype="category"),
+        Column("State", dtype="category"),
+        Column("Salary"),
+    ],
+    keep_undeclared=True,
+    drop=("JV Link", "JV ID"),
+)
+
+
+def _schema_notices(sheet, missing_required, missing_optional, notices):
+    # One notice per problem kind, so a broken sheet is reported once rather than per section
+    if missing_required:
+        notices.append(("error", f"⚠️ {sheet} sheet is missing required columns: {', '.join(missing_required)}"))
+    if missing_optional:
+        notices.append(("info", f"{sheet} sheet has no {', '.join(missing_optional)} column(s); related fields are left blank."))
+
+
+# ---- Compact dtypes ----
+# Text columns that repeat a lot (statuses, verticals, sites, cities) are
+# stored as categoricals: one copy of each distinct value plus small integer
+# codes. Columns listed per sheet are always converted; any other text column
+# is converted when its distinct values are at most this share of its rows.
+CATEGORY_MAX_RATIO = 0.5
+CANDIDATE_CATEGORIES = CANDIDATE_SCHEMA.categories()
+JOB_CATEGORIES = JOB_SCHEMA.categories()
+
+
+def _is_text(col):
+    return col.dtype == object or pd.api.types.is_string_dtype(col.dtype)
+
+
+def _whole_number_dtype(col):
+    """Smallest integer dtype holding float ``col`` exactly, or None.
+
+    Columns with blanks get the nullable ``Int8``/``Int16``/``Int32`` types.
+    """
+    values = col.to_numpy(dtype=float)
+    present = values[~np.isnan(values)]
+    if not len(present) or not np.array_equal(present, np.trunc(present)):
+        return None
+    for dtype in ("int8", "int16", "int32"):
+        info = np.iinfo(dtype)
+        if info.min <= present.min() and present.max() <= info.max:
+            return dtype.capitalize() if len(present) < len(values) else dtype
+    return None
+
+
+def compact_frame(df, categories=(), max_ratio=CATEGORY_MAX_RATIO):
+    """``df`` with smaller dtypes and the same values.
+
+    Repetitive text becomes categorical, whole-number floats (such as Week)
+    and integers become the smallest integer type (nullable ``Int16`` and
+    friends when there are blanks), and other floats are downcast to float32
+    when that loses nothing.
+    """
+    out = {}
+    for name, col in df.items():
+        if isinstance(col.dtype, pd.CategoricalDtype):
+            pass
+        elif _is_text(col):
+            if name in categories or col.nunique() <= max_ratio * len(col):
+                col = col.astype("category")
+        elif pd.api.types.is_float_dtype(col.dtype):
+            whole = _whole_number_dtype(col)
+            small = col.astype(whole or "float32")
+            if whole or np.array_equal(small.to_numpy(dtype=float), col.to_numpy(dtype=float), equal_nan=True):
+                col = small
+        elif pd.api.types.is_integer_dtype(col.dtype) and not pd.api.types.is_extension_array_dtype(col.dtype):
+            col = pd.to_numeric(col, downcast="integer")
+        out[name] = col
+    return pd.DataFrame(out, index=df.index)
+
+
+# ---- Pipeline stages ----
+OFFER_PENDING = "Offer Pending"
+OFFER_ACCEPTED = "Offer Accepted"
+POSITION_IDENTIFIED = "Position Identified"
+READY = "Ready for Placement"
+BEGINNING = "Beginning Training"
+NEAR_READY = "Near Ready"
+TRAINING_OTHER = "In Training (Other)"
+OTHER = "Other"
+STAGES = [OFFER_PENDING, OFFER_ACCEPTED, POSITION_IDENTIFIED, READY, BEGINNING, NEAR_READY, TRAINING_OTHER, OTHER]
+
+# "In Training (Weeks 1–5)" counts every training candidate not yet past week 6
+IN_TRAINING_STAGES = [BEGINNING, NEAR_READY, TRAINING_OTHER]
+
+# Statuses counted in "Total Candidates"
+ACTIVE_STATUSES = ["free agent discussing opportunity", "unassigned", "training", "offer accepted"]
+
+# Statuses eligible for job matching
+MATCHABLE_STATUSES = ["training", "unassigned", "free agent discussing opportunity"]
+
+# Columns of the per-stage candidate tables (dashboard and snapshots)
+STAGE_TABLE_COLUMNS = ["MIT Name", "Training Site", "Location", "Week", "Salary", "Level"]
+OFFER_PENDING_COLUMNS = ["MIT Name", "Training Site", "Location", "Level"]
+
+
+def classify_stages(df):
+    """Assign every row exactly one pipeline stage as a categorical.
+
+    Offer/placement statuses win; otherwise anyone past week 6 is ready for
+    placement, and training candidates are split by week.
+    """
+    week = pd.to_numeric(df["Week"], errors="coerce") if "Week" in df.columns else pd.Series(np.nan, index=df.index)
+    status = df["Status"]
+    training = status.eq("training")
+    stage = np.select(
+        [
+            status.eq("offer pending"),
+            status.eq("offer accepted"),
+            status.eq("position identified"),
+            (week > 6) & status.notna(),
+            training & week.between(1, 3),
+            training & week.between(4, 6),
+            training & (week <= 6),
+        ],
+        [OFFER_PENDING, OFFER_ACCEPTED, POSITION_IDENTIFIED, READY, BEGINNING, NEAR_READY, TRAINING_OTHER],
+        default=OTHER,
+    )
+    return pd.Categorical(stage, categories=STAGES)
+
+
+# ---- Loaders ----
+# Both sheets are fetched concurrently; timeouts and retries are per sheet.
+# Each sheet's schema prunes and types its columns while parsing.
+SHEETS = [
+    Sheet(
+        "candidates",
+        "https://docs.google.com/spreadsheets/d/e/"
+        "2PACX-1vTAdbdhuieyA-axzb4aLe8c7zdAYXBLPNrIxKRder6j1ZAlj2g4U1k0YzkZbm_dEcSwBik4CJ57FROJ/"
+        "pub?gid=813046237&single=true&output=csv",
+        {"skiprows": 1, **CANDIDATE_SCHEMA.read_csv_kwargs()},  # Skip only the first row with "Training info"
+        timeout=20,
+        retries=2,
+    ),
+    # ✅ Your real Open Jobs Google Sheets URL
+    Sheet(
+        "jobs",
+        "https://docs.google.com/spreadsheets/d/e/"
+        "2PACX-1vSbD6wUrZEt9kuSQpUT2pw0FMOb7h1y8xeX-hDTeiiZUPjtV0ohK_WcFtCSt_4nuxdtn9zqFS8z8aGw/"
+        "pub?gid=116813539&single=true&output=csv",
+        {"skiprows": 5, "header": 0, **JOB_SCHEMA.read_csv_kwargs()},
+        timeout=20,
+        retries=2,
+    ),
+]
+
+
+def load_data(fetched, notices, today=None, compact=True):
+    """Clean the candidate sheet; ``compact`` stores it with smaller dtypes."""
+    if fetched.error is not None:
+        notices.append(("error", f"⚠️ Google Sheets error: {fetched.error}"))
+        return pd.DataFrame(), "Error"
+    df = fetched.df
+    data_source = "Google Sheets"
+    if fetched.how == STALE:
+        notices.append(("warning", "⚠️ Google Sheets is unreachable — showing the last good snapshot."))
+
+    df, missing_required, missing_optional = CANDIDATE_SCHEMA.conform(df)
+    _schema_notices("Candidate", missing_required, missing_optional, notices)
+    if missing_required:
+        return pd.DataFrame(), "Error"
+
+    df = df.dropna(how="all")
+    if "Start Date" in df.columns:
+        df["Start Date"] = pd.to_datetime(df["Start Date"], errors="coerce")
+
+    # Weeks from start date, falling back to the Week column
+    df["Week"] = calc_weeks(df, today=today)
+
+    if "Salary" in df.columns:
+        df = df.join(normalize_salary(df["Salary"]))
+        df["Salary"] = df["Salary Mid"]
+
+    df["Status"] = df["Status"].astype(str).str.strip().str.lower()
+
+    # One pipeline stage per row; every metric, chart and section reads from it
+    df["Stage"] = classify_stages(df)
+    if compact:
+        df = compact_frame(df, CANDIDATE_CATEGORIES)
+    return df, data_source
+
+
+def load_jobs_data(fetched, notices, compact=True):
+    """Clean the open jobs sheet; ``compact`` stores it with smaller dtypes."""
+    try:
+        if fetched.error is not None:
+            raise fetched.error
+        jobs_df = fetched.df
+        if fetched.how == STALE:
+            notices.append(("warning", "⚠️ Open Jobs sheet is unreachable — showing the last good snapshot."))
+        jobs_df, missing_required, missing_optional = JOB_SCHEMA.conform(jobs_df)
+        _schema_notices("Open Jobs", missing_required, missing_optional, notices)
+        if missing_required:
+            return pd.DataFrame()
+        jobs_df = jobs_df.dropna(how="all")
+        # Blank text cells read as "" (job titles, accounts, cities); numeric columns keep NaN
+        for col in jobs_df.columns:
+            if isinstance(jobs_df[col].dtype, pd.CategoricalDtype):
+                if "" not in jobs_df[col].cat.categories:
+                    jobs_df[col] = jobs_df[col].cat.add_categories("")
+                jobs_df[col] = jobs_df[col].fillna("")
+            elif _is_text(jobs_df[col]):
+                jobs_df[col] = jobs_df[col].fillna("")
+        if "Salary" in jobs_df.columns:
+            jobs_df = jobs_df.join(normalize_salary(jobs_df["Salary"]))
+        if compact:
+            jobs_df = compact_frame(jobs_df, JOB_CATEGORIES)
+        return jobs_df
+    except Exception as e:
+        notices.append(("error", f"Error loading jobs data: {e}"))
+        return pd.DataFrame()
@@ -0,0 +1,70 @@
+"""Stale-while-revalidate holder for the dashboard's loaded data.
+
+Viewers always read the current value immediately. A daemon thread reloads
+it every ``interval`` seconds and swaps the new value in only once it has
+loaded completely, so a rerun never sees a half-refreshed state. A
+background load that overlaps a forced ``refresh()`` is discarded, so it
+can't replace the newer value.
+
+``load`` is called with the current value (None the first time), so it can
+reuse work from the previous load.
+"""
+import threading
+import time
+
+
+class BackgroundRefresher:
+    def __init__(self, load, interval=60):
+        self._load = load
+        self.interval = interval
+        self._value = None
+        self.version = 0
+        self.loaded_at = None
+        self.last_error = None
+        self._load_lock = threading.Lock()
+        self._thread_lock = threading.Lock()
+        self._thread = None
+
+    def get(self):
+        """Current value; only the very first call waits for a load."""
+        if self._value is None:
+            with self._load_lock:
+                if self._value is None:
+                    self._swap(self._load(self._value))
+        self._start()
+        return self._value
+
+    def refresh(self, **kwargs):
+        """Reload right now and return the new value; ``kwargs`` are passed to ``load``."""
+        with self._load_lock:
+            self._swap(self._load(self._value, **kwargs))
+        self._start()
+        return self._value
+
+    def _swap(self, value):
+        # A single attribute assignment, so readers see the old or the new value, never a mix
+        self._value = value
+        self.version += 1
+        self.loaded_at = time.time()
+        self.last_error = None
+
+    def _start(self):
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="dashboard-refresh", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            started = self.version
+            try:
+                value = self._load(self._value)
+            except Exception as e:
+                # Keep serving the previous value
+                self.last_error = e
+                continue
+            with self._load_lock:
+                # A refresh() that finished meanwhile loaded newer data; this result is stale
+                if self.version == started:
+                    self._swap(value)
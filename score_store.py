@@ -0,0 +1,208 @@
+"""Persistent store of match scores, queryable from either side.
+
+Each data version's best pairs are written once to an SQLite file: every
+candidate's top ``STORE_TOP_K`` jobs and every job's top ``STORE_TOP_K``
+candidates. Lookups by candidate, job, vertical or state then read indexed
+rows instead of rescoring the grid::
+
+    store = ScoreStore()
+    store.write(version, cand_feats, job_feats)
+    store.jobs_for_candidate(version, "Jane Doe", k=3)
+    store.candidates_for_job(version, job=12, k=5)
+
+Jobs are identified by their row position in that version's jobs sheet,
+so positions only mean something within one version. A version that isn't
+stored (or has been pruned) answers with an empty frame; callers that want
+the newest data instead ask ``latest_version()`` for it.
+"""
+import contextlib
+import os
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+
+from matching import top_candidate_indices, top_job_indices
+
+STORE_PATH = os.environ.get(
+    "SCORE_STORE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".score_store.sqlite"),
+)
+
+# Pairs kept per candidate and per job; the dashboard never asks for more
+STORE_TOP_K = 10
+# Older data versions are dropped once this many are stored
+KEEP_VERSIONS = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS versions (
+    version TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    candidates INTEGER NOT NULL,
+    jobs INTEGER NOT NULL,
+    k INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS scores (
+    version TEXT NOT NULL,
+    candidate TEXT,
+    week REAL,
+    status TEXT,
+    job INTEGER NOT NULL,
+    account TEXT,
+    title TEXT,
+    city TEXT,
+    state TEXT,
+    vert TEXT,
+    score REAL NOT NULL,
+    candidate_rank INTEGER,
+    job_rank INTEGER
+);
+CREATE INDEX IF NOT EXISTS scores_by_candidate ON scores (version, candidate, candidate_rank);
+CREATE INDEX IF NOT EXISTS scores_by_job ON scores (version, job, job_rank);
+CREATE INDEX IF NOT EXISTS scores_by_vert ON scores (version, vert);
+CREATE INDEX IF NOT EXISTS scores_by_state ON scores (version, state);
+"""
+
+# Column names in query results, matching the readiness section's match frames
+_RESULT_COLUMNS = """
+    candidate AS "Candidate", job AS "Job", account AS "Job Account", title AS "Title",
+    city AS "City", state AS "State", vert AS "VERT", score AS "Total Score",
+    week AS "Week", status AS "Status"
+"""
+
+
+def _text(values):
+    return pd.Series(values, dtype=object).where(pd.notna(values), None).map(lambda v: v if v is None else str(v))
+
+
+def score_pairs(cand_feats, job_feats, k=STORE_TOP_K, rankings=None):
+    """Every candidate's top ``k`` jobs and every job's top ``k`` candidates, one row per pair.
+
+    A pair in both lists appears once, with both ranks set. ``rankings`` is an
+    already computed ``(top_jobs, top_candidates)`` pair of ``TopK``s to
+    store instead of scoring.
+    """
+    if rankings is not None:
+        (job_cols, job_scores), (cand_rows, cand_scores) = [(r.cols[:, :k], r.scores[:, :k]) for r in rankings]
+    else:
+        job_cols, job_scores = top_job_indices(cand_feats, job_feats, k)
+        cand_rows, cand_scores = top_candidate_indices(cand_feats, job_feats, k)
+    by_candidate = pd.DataFrame({
+        "cand_idx": np.repeat(np.arange(len(cand_feats)), job_cols.shape[1]),
+        "job": job_cols.ravel(),
+        "score": job_scores.ravel(),
+        "candidate_rank": np.tile(np.arange(1, job_cols.shape[1] + 1), len(cand_feats)),
+    })
+    by_job = pd.DataFrame({
+        "cand_idx": cand_rows.ravel(),
+        "job": np.repeat(np.arange(len(job_feats)), cand_rows.shape[1]),
+        "score": cand_scores.ravel(),
+        "job_rank": np.tile(np.arange(1, cand_rows.shape[1] + 1), len(job_feats)),
+    })
+    pairs = by_candidate.merge(by_job, on=["cand_idx", "job", "score"], how="outer")
+
+    cand_idx, job_idx = pairs["cand_idx"].to_numpy(), pairs["job"].to_numpy()
+    return pd.DataFrame({
+        "candidate": _text(cand_feats["candidate"].to_numpy()[cand_idx]),
+        "week": pd.to_numeric(pd.Series(cand_feats["week"].to_numpy()[cand_idx]), errors="coerce").astype(float),
+        "status": _text(cand_feats["status"].to_numpy()[cand_idx]),
+        "job": job_idx.astype(int),
+        "account": _text(job_feats["account"].to_numpy()[job_idx]),
+        "title": _text(job_feats["title"].to_numpy()[job_idx]),
+        "city": _text(job_feats["city"].to_numpy()[job_idx]),
+        "state": _text(job_feats["state"].to_numpy()[job_idx]),
+        "vert": _text(job_feats["vert"].to_numpy()[job_idx]),
+        "score": pairs["score"].to_numpy(dtype=float),
+        "candidate_rank": pairs["candidate_rank"].astype("Int64"),
+        "job_rank": pairs["job_rank"].astype("Int64"),
+    })
+
+
+class ScoreStore:
+    """Match scores for recent data versions in one SQLite file.
+
+    Every call opens (and closes) its own connection, so one store can be
+    shared by the refresh thread and every page rerun.
+    """
+
+    def __init__(self, path=STORE_PATH):
+        self.path = path
+        with self._connection() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        # Readers keep working while a refresh writes the next version
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @contextlib.contextmanager
+    def _connection(self):
+        # sqlite3's own context manager only commits or rolls back; this also closes
+        with contextlib.closing(self._connect()) as conn, conn:
+            yield conn
+
+    def _query(self, sql, params):
+        with self._connection() as conn:
+            return pd.read_sql_query(sql, conn, params=params)
+
+    def has_version(self, version):
+        with self._connection() as conn:
+            return conn.execute("SELECT 1 FROM versions WHERE version = ?", (version,)).fetchone() is not None
+
+    def latest_version(self):
+        with self._connection() as conn:
+            row = conn.execute("SELECT version FROM versions ORDER BY created_at DESC LIMIT 1").fetchone()
+        return row[0] if row else None
+
+    def write(self, version, cand_feats, job_feats, k=STORE_TOP_K, rankings=None):
+        """Score and store ``version`` unless it is already stored. Returns True if it wrote.
+
+        ``rankings`` passes already computed rankings on to ``score_pairs``.
+        """
+        if self.has_version(version):
+            return False
+        rows = score_pairs(cand_feats, job_feats, k, rankings)
+        rows.insert(0, "version", version)
+        with self._connection() as conn:
+            rows.to_sql("scores", conn, if_exists="append", index=False)
+            conn.execute(
+                "INSERT INTO versions VALUES (?, ?, ?, ?, ?)",
+                (version, time.time(), len(cand_feats), len(job_feats), k),
+            )
+            stale = [v for (v,) in conn.execute(
+                "SELECT version FROM versions ORDER BY created_at DESC LIMIT -1 OFFSET ?", (KEEP_VERSIONS,)
+            )]
+            for old in stale:
+                conn.execute("DELETE FROM scores WHERE version = ?", (old,))
+                conn.execute("DELETE FROM versions WHERE version = ?", (old,))
+        return True
+
+    def jobs_for_candidate(self, version, candidate, k=3):
+        """The candidate's best ``k`` jobs, best first."""
+        return self._query(
+            f"SELECT {_RESULT_COLUMNS}, candidate_rank AS \"Rank\" FROM scores "
+            "WHERE version = ? AND candidate = ? AND candidate_rank <= ? ORDER BY candidate_rank",
+            (version, candidate, k),
+        )
+
+    def candidates_for_job(self, version, job, k=3):
+        """The best ``k`` candidates for the job at row ``job``, best first."""
+        return self._query(
+            f"SELECT {_RESULT_COLUMNS}, job_rank AS \"Rank\" FROM scores "
+            "WHERE version = ? AND job = ? AND job_rank <= ? ORDER BY job_rank",
+            (version, int(job), k),
+        )
+
+    def top_candidates_per_job(self, version, k=3, vert=None, state=None):
+        """Best ``k`` candidates for every job, optionally only jobs in one vertical or state."""
+        sql = f"SELECT {_RESULT_COLUMNS}, job_rank AS \"Rank\" FROM scores WHERE version = ? AND job_rank <= ?"
+        params = [version, k]
+        if vert is not None:
+            sql += " AND vert = ?"
+            params.append(vert)
+        if state is not None:
+            sql += " AND state = ?"
+            params.append(state)
+        return self._query(sql + " ORDER BY job, job_rank", params)
@@ -0,0 +1,194 @@
+"""Loaded dashboard data shared by every app process on one machine.
+
+Replicas behind a load balancer each run their own refresher. With a shared
+cache only one of them refreshes at a time: it takes an exclusive file lock,
+runs the pipeline and publishes the result as a new generation directory.
+The others keep serving the current generation and simply open the new one
+once it is published, instead of fetching and parsing the sheets
+themselves.
+
+A generation holds the frames as Arrow IPC files, the rankings as ``.npy``
+arrays and everything else as JSON. The ranking arrays are memory-mapped, so
+every process shares them through the page cache. Frames are read from
+memory-mapped Arrow files too, but only numeric columns without blanks reach
+pandas without a copy; columns with blanks (NaN floats, nullable integers),
+booleans, text and dates are converted, and so copied, once per process when
+a generation is opened.
+"""
+import contextlib
+import json
+import os
+import shutil
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from incremental import TopK
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, each process refreshes on its own schedule
+    fcntl = None
+
+SHARED_CACHE_DIR = os.environ.get(
+    "SHARED_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".shared_cache"),
+)
+
+FRAMES = ["df", "jobs_df", "cand_feats", "job_feats", "memory"]
+RANKINGS = ["top_jobs", "top_candidates"]
+TOPK_ARRAYS = ["row_hashes", "col_hashes", "cols", "scores"]
+CURRENT = "CURRENT"
+
+
+def _write_frame(path, df):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.OSFile(path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def _read_frame(path):
+    with pa.memory_map(path) as source:
+        return pa.ipc.open_file(source).read_all().to_pandas(split_blocks=True)
+
+
+class SharedCache:
+    def __init__(self, cache_dir=SHARED_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.lock_path = os.path.join(cache_dir, "refresh.lock")
+        self.current_path = os.path.join(cache_dir, CURRENT)
+
+    @contextlib.contextmanager
+    def lock(self, blocking=True):
+        """Hold the refresh lock; yields False if ``blocking`` is off and another process has it."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(self.lock_path, "a+") as f:
+            if fcntl is None:
+                yield True
+                return
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def current(self):
+        """Name of the published generation, or None."""
+        try:
+            with open(self.current_path, encoding="utf-8") as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def _meta(self, generation):
+        with open(os.path.join(self.cache_dir, generation, "meta.json"), encoding="utf-8") as f:
+            return json.load(f)
+
+    def age(self, generation):
+        """Seconds since ``generation`` was published."""
+        return time.time() - self._meta(generation)["published_at"]
+
+    def read(self, generation):
+        """The data dict stored in ``generation``, with memory-mapped ranking arrays."""
+        gen_dir = os.path.join(self.cache_dir, generation)
+        meta = self._meta(generation)
+        data = dict(meta["fields"])
+        data["loaded_at"] = pd.Timestamp(data["loaded_at"])
+        data["notices"] = [tuple(notice) for notice in data["notices"]]
+        for name in FRAMES:
+            path = os.path.join(gen_dir, f"{name}.arrow")
+            data[name] = _read_frame(path) if os.path.exists(path) else None
+        data["rankings"] = None
+        if meta["ranking_k"] is not None:
+            data["rankings"] = tuple(
+                TopK(*[np.load(os.path.join(gen_dir, f"{side}.{arr}.npy"), mmap_mode="r") for arr in TOPK_ARRAYS], meta["ranking_k"])
+                for side in RANKINGS
+            )
+        data["shared_generation"] = generation
+        return data
+
+    def publish(self, data):
+        """Write ``data`` as a new generation and make it current; returns the generation name."""
+        generation = f"{data['version']}-{uuid.uuid4().hex[:8]}"
+        gen_dir = os.path.join(self.cache_dir, generation)
+        tmp_dir = f"{gen_dir}.tmp"
+        os.makedirs(tmp_dir)
+        try:
+            for name in FRAMES:
+                if data.get(name) is not None:
+                    _write_frame(os.path.join(tmp_dir, f"{name}.arrow"), data[name])
+            rankings = data.get("rankings")
+            if rankings is not None:
+                for side, ranking in zip(RANKINGS, rankings):
+                    for arr in TOPK_ARRAYS:
+                        np.save(os.path.join(tmp_dir, f"{side}.{arr}.npy"), np.asarray(getattr(ranking, arr)))
+            skip = set(FRAMES) | {"rankings", "shared_generation"}
+            fields = {key: value for key, value in data.items() if key not in skip}
+            fields["loaded_at"] = data["loaded_at"].isoformat()
+            meta = {
+                "published_at": time.time(),
+                "ranking_k": rankings[0].k if rankings is not None else None,
+                "fields": fields,
+            }
+            with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump(meta, f, default=str)
+            os.replace(tmp_dir, gen_dir)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        tmp_current = f"{self.current_path}.tmp"
+        with open(tmp_current, "w", encoding="utf-8") as f:
+            f.write(generation)
+        previous = self.current()
+        os.replace(tmp_current, self.current_path)
+        self._prune(keep={generation, previous})
+        return generation
+
+    def _prune(self, keep):
+        # The previous generation stays for readers still opening it; open maps survive deletion anyway
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if os.path.isdir(path) and name not in keep and not name.endswith(".tmp"):
+                shutil.rmtree(path, ignore_errors=True)
+
+    def load(self, build, previous=None, max_age=60, force=False):
+        """Current shared data, refreshing it with ``build(previous)`` if it is older than ``max_age``.
+
+        Only the process holding the lock refreshes; while it does, others get
+        the published generation (or wait for the first one). ``force``
+        refreshes regardless of age, waiting for a refresh already running
+        and using its result instead. ``previous`` is returned unchanged when
+        it already is the current generation.
+        """
+        generation = self.current()
+        if not force and generation is not None and self.age(generation) < max_age:
+            return self._reuse(previous, generation)
+
+        with self.lock(blocking=force or generation is None) as acquired:
+            if not acquired:
+                return self._reuse(previous, generation)
+            # Another process may have refreshed while this one waited for the lock
+            latest = self.current()
+            if latest is not None and latest != generation and (force or self.age(latest) < max_age):
+                return self._reuse(previous, latest)
+            data = build(previous)
+            try:
+                data["shared_generation"] = self.publish(data)
+            except Exception as e:
+                # Still serve this process; the next refresh tries to publish again
+                data["notices"] = data["notices"] + [("warning", f"⚠️ Could not share the loaded data with other app processes: {e}")]
+            return data
+
+    def _reuse(self, previous, generation):
+        if previous is not None and previous.get("shared_generation") == generation:
+            return previous
+        return self.read(generation)
@@ -0,0 +1,201 @@
+"""Published Google Sheets fetching with an on-disk snapshot cache.
+
+Each sheet keeps its last good payload, the DataFrame parsed from it (as
+Parquet) and the validators the server sent. Later fetches send
+``If-None-Match``/``If-Modified-Since``; on a 304, or when the payload hash
+is unchanged, the snapshot is served without re-parsing. When the upstream
+fails the last good snapshot is served instead.
+"""
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+CACHE_DIR = os.environ.get(
+    "SHEET_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".sheet_cache"),
+)
+
+# How a fetch was satisfied
+DOWNLOADED = "downloaded"
+NOT_MODIFIED = "not modified"
+UNCHANGED = "unchanged"
+STALE = "stale snapshot"
+
+# One published sheet and how to fetch it
+Sheet = namedtuple("Sheet", ["name", "url", "read_csv_kwargs", "timeout", "retries"], defaults=(None, 30, 2))
+
+# Outcome of fetching one sheet: the frame and how it was served, or the error
+FetchResult = namedtuple("FetchResult", ["df", "how", "error"])
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def make_session(pool_size=4):
+    """A keep-alive session whose pool can hold one connection per concurrent fetch."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def shared_session():
+    """Process-wide session so repeated refreshes reuse open connections."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = make_session()
+        return _session
+
+
+class SheetSnapshot:
+    """Files backing one cached sheet: payload, parsed frame and metadata."""
+
+    def __init__(self, name, cache_dir=CACHE_DIR):
+        self.name = name
+        self.cache_dir = cache_dir
+        self.payload_path = os.path.join(cache_dir, f"{name}.csv")
+        self.frame_path = os.path.join(cache_dir, f"{name}.parquet")
+        self.meta_path = os.path.join(cache_dir, f"{name}.json")
+
+    def read_meta(self):
+        try:
+            with open(self.meta_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def exists(self):
+        return os.path.exists(self.meta_path) and os.path.exists(self.payload_path)
+
+    def read_frame(self, read_csv_kwargs):
+        """Parsed snapshot, re-parsing the stored payload if the Parquet copy is unusable."""
+        try:
+            return pd.read_parquet(self.frame_path)
+        except Exception:
+            with open(self.payload_path, "rb") as f:
+                return pd.read_csv(io.BytesIO(f.read()), **read_csv_kwargs)
+
+    def write(self, payload, df, meta):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        _write_atomic(self.payload_path, payload)
+        try:
+            buf = io.BytesIO()
+            df.to_parquet(buf)
+            _write_atomic(self.frame_path, buf.getvalue())
+        except Exception:
+            # Frames pyarrow can't store are re-parsed from the payload instead
+            if os.path.exists(self.frame_path):
+                os.remove(self.frame_path)
+        _write_atomic(self.meta_path, json.dumps(meta).encode("utf-8"))
+
+
+def _write_atomic(path, data):
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _get(http, url, headers, timeout, retries, backoff):
+    """GET with up to ``retries`` extra attempts on connection errors and 5xx."""
+    for attempt in range(retries + 1):
+        try:
+            resp = http.get(url, headers=headers, timeout=timeout)
+            if resp.status_code < 500:
+                return resp
+            resp.raise_for_status()
+        except requests.RequestException:
+            if attempt == retries:
+                raise
+        time.sleep(backoff * 2 ** attempt)
+
+
+def fetch_sheet(url, name, read_csv_kwargs=None, cache_dir=CACHE_DIR, session=None, timeout=30, retries=0, backoff=0.5):
+    """Fetch and parse a CSV sheet, reusing the on-disk snapshot when possible.
+
+    Returns ``(df, how)`` where ``how`` is one of ``DOWNLOADED``,
+    ``NOT_MODIFIED``, ``UNCHANGED`` or ``STALE``. Raises the upstream error
+    only when there is no snapshot to fall back on.
+    """
+    read_csv_kwargs = read_csv_kwargs or {}
+    snapshot = SheetSnapshot(name, cache_dir)
+    meta = snapshot.read_meta() if snapshot.exists() else {}
+    if meta.get("url") != url:
+        meta = {}
+
+    headers = {}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+
+    http = session or requests
+    try:
+        resp = _get(http, url, headers, timeout, retries, backoff)
+        if resp.status_code == 304 and meta:
+            return snapshot.read_frame(read_csv_kwargs), NOT_MODIFIED
+        resp.raise_for_status()
+    except Exception:
+        if meta:
+            return snapshot.read_frame(read_csv_kwargs), STALE
+        raise
+
+    payload = resp.content
+    digest = hashlib.sha256(payload).hexdigest()
+    new_meta = {
+        "url": url,
+        "etag": resp.headers.get("ETag"),
+        "last_modified": resp.headers.get("Last-Modified"),
+        "sha256": digest,
+    }
+    if meta and meta.get("sha256") == digest:
+        if new_meta != meta:
+            _write_atomic(snapshot.meta_path, json.dumps(new_meta).encode("utf-8"))
+        return snapshot.read_frame(read_csv_kwargs), UNCHANGED
+
+    try:
+        df = pd.read_csv(io.BytesIO(payload), **read_csv_kwargs)
+    except Exception:
+        if meta:
+            return snapshot.read_frame(read_csv_kwargs), STALE
+        raise
+    try:
+        snapshot.write(payload, df, new_meta)
+    except OSError:
+        # A read-only cache dir shouldn't take the page down
+        pass
+    return df, DOWNLOADED
+
+
+def fetch_sheets(sheets, cache_dir=CACHE_DIR, session=None):
+    """Fetch several sheets in parallel over one pooled session.
+
+    Each sheet uses its own timeout and retry count. Returns
+    ``{sheet.name: FetchResult}``; a failure in one sheet doesn't affect the
+    others.
+    """
+    session = session or shared_session()
+
+    def fetch(sheet):
+        try:
+            df, how = fetch_sheet(
+                sheet.url, sheet.name, sheet.read_csv_kwargs, cache_dir=cache_dir,
+                session=session, timeout=sheet.timeout, retries=sheet.retries,
+            )
+            return FetchResult(df, how, None)
+        except Exception as e:
+            return FetchResult(None, None, e)
+
+    with ThreadPoolExecutor(max_workers=max(len(sheets), 1)) as pool:
+        return dict(zip([sheet.name for sheet in sheets], pool.map(fetch, sheets)))
@@ -0,0 +1,226 @@
+"""Versioned snapshots of the dashboard for other teams, and a tiny server for them.
+
+Every refresh with new data writes one directory per data version::
+
+    .snapshots/<version>/snapshot.json       metrics, stage tables and top matches
+    .snapshots/<version>/metrics.json
+    .snapshots/<version>/<table>.parquet     ready, in_training, offer_pending, top_matches
+    .snapshots/LATEST                        the newest version
+
+Consumers poll the read-only server, which answers with the version as the
+ETag and a 304 when it hasn't changed::
+
+    python snapshot.py serve --port 8600
+    curl -H 'If-None-Match: "<etag>"' http://localhost:8600/snapshot.json
+
+``/<file>`` serves the latest version and ``/<version>/<file>`` a pinned
+one. ``python snapshot.py write`` publishes a snapshot without the app.
+"""
+import argparse
+import json
+import os
+import shutil
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from compute import compute_top_matches, load_dashboard_data, write_frame
+from pipeline import IN_TRAINING_STAGES, OFFER_PENDING, OFFER_PENDING_COLUMNS, READY, STAGE_TABLE_COLUMNS
+
+SNAPSHOT_DIR = os.environ.get(
+    "SNAPSHOT_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".snapshots"),
+)
+# Matches per candidate in a snapshot, as on the dashboard by default
+SNAPSHOT_TOP_K = 3
+# Older versions are deleted once this many are published
+KEEP_SNAPSHOTS = 5
+LATEST = "LATEST"
+
+TABLES = {
+    "ready": ([READY], STAGE_TABLE_COLUMNS),
+    "in_training": (IN_TRAINING_STAGES, STAGE_TABLE_COLUMNS),
+    "offer_pending": ([OFFER_PENDING], OFFER_PENDING_COLUMNS),
+}
+CONTENT_TYPES = {".json": "application/json", ".parquet": "application/vnd.apache.parquet"}
+
+
+def _records(df):
+    return json.loads(df.to_json(orient="records", date_format="iso"))
+
+
+def snapshot_tables(data, k=SNAPSHOT_TOP_K):
+    """``{table name: frame}`` for the stage tables and each candidate's top ``k`` matches."""
+    df = data["df"]
+    tables = {}
+    for name, (stages, cols) in TABLES.items():
+        rows = df[df["Stage"].isin(stages)] if "Stage" in df.columns else df.iloc[:0]
+        tables[name] = rows[[col for col in cols if col in rows.columns]].reset_index(drop=True)
+    tables["top_matches"] = compute_top_matches(data, k=k).reset_index(drop=True)
+    return tables
+
+
+def latest_version(snapshot_dir=SNAPSHOT_DIR):
+    try:
+        with open(os.path.join(snapshot_dir, LATEST), encoding="utf-8") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def _set_latest(snapshot_dir, version):
+    tmp_latest = os.path.join(snapshot_dir, f"{LATEST}.tmp")
+    with open(tmp_latest, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(tmp_latest, os.path.join(snapshot_dir, LATEST))
+
+
+def write_snapshot(data, snapshot_dir=SNAPSHOT_DIR, k=SNAPSHOT_TOP_K):
+    """Publish ``data`` as a snapshot unless its version already is one. Returns True if it wrote.
+
+    Either way ``data``'s version becomes the latest one.
+    """
+    version = data["version"]
+    out_dir = os.path.join(snapshot_dir, version)
+    if os.path.isdir(out_dir):
+        # Data that changed back (A → B → A) is published already, but LATEST still names B
+        if latest_version(snapshot_dir) != version:
+            os.utime(out_dir)  # newest again, so pruning keeps it
+            _set_latest(snapshot_dir, version)
+        return False
+    tables = snapshot_tables(data, k)
+    tmp_dir = f"{out_dir}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    try:
+        for name, frame in tables.items():
+            write_frame(frame, os.path.join(tmp_dir, name), "parquet")
+        header = {
+            "version": version,
+            "loaded_at": data["loaded_at"].isoformat(),
+            "data_source": data["data_source"],
+            "metrics": data["metrics"],
+        }
+        with open(os.path.join(tmp_dir, "metrics.json"), "w", encoding="utf-8") as f:
+            json.dump(header, f, indent=2)
+        with open(os.path.join(tmp_dir, "snapshot.json"), "w", encoding="utf-8") as f:
+            json.dump({**header, "tables": {name: _records(frame) for name, frame in tables.items()}}, f)
+        os.replace(tmp_dir, out_dir)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    _set_latest(snapshot_dir, version)
+
+    versions = sorted(
+        (name for name in os.listdir(snapshot_dir) if os.path.isdir(os.path.join(snapshot_dir, name)) and not name.endswith(".tmp")),
+        key=lambda name: os.path.getmtime(os.path.join(snapshot_dir, name)),
+        reverse=True,
+    )
+    for old in versions[KEEP_SNAPSHOTS:]:
+        shutil.rmtree(os.path.join(snapshot_dir, old), ignore_errors=True)
+    return True
+
+
+def publish_snapshot(data, snapshot_dir=SNAPSHOT_DIR):
+    """``write_snapshot`` for a refresh: failures become a notice instead of failing the load."""
+    if data["df"].empty or not snapshot_dir:
+        return data
+    try:
+        write_snapshot(data, snapshot_dir)
+    except Exception as e:
+        data["notices"].append(("warning", f"⚠️ Snapshot could not be published: {e}"))
+    return data
+
+
+# ---- Read-only server ----
+class SnapshotHandler(BaseHTTPRequestHandler):
+    snapshot_dir = SNAPSHOT_DIR
+
+    def _resolve(self):
+        """``(version, file path, pinned)`` for the request, or None."""
+        parts = [part for part in self.path.split("?", 1)[0].split("/") if part]
+        if len(parts) == 1:
+            version, name, pinned = latest_version(self.snapshot_dir), parts[0], False
+        elif len(parts) == 2:
+            (version, name), pinned = parts, True
+        else:
+            return None
+        if version is None or name.startswith(".") or version.startswith(".") or "\\" in name + version:
+            return None
+        path = os.path.join(self.snapshot_dir, version, name)
+        if not os.path.isfile(path) or os.path.splitext(name)[1] not in CONTENT_TYPES:
+            return None
+        return version, path, pinned
+
+    def _respond(self, body):
+        resolved = self._resolve()
+        if resolved is None:
+            self.send_error(404)
+            return
+        version, path, pinned = resolved
+        etag = f'"{version}"'
+        if etag in [tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")]:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        with open(path, "rb") as f:
+            content = f.read()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPES[os.path.splitext(path)[1]])
+        self.send_header("Content-Length", str(len(content)))
+        self.send_header("ETag", etag)
+        # A pinned version never changes; the latest one must be revalidated
+        self.send_header("Cache-Control", "public, max-age=31536000, immutable" if pinned else "no-cache")
+        self.end_headers()
+        if body:
+            self.wfile.write(content)
+
+    def do_GET(self):
+        self._respond(body=True)
+
+    def do_HEAD(self):
+        self._respond(body=False)
+
+
+def serve(snapshot_dir=SNAPSHOT_DIR, host="127.0.0.1", port=8600):
+    handler = type("Handler", (SnapshotHandler,), {"snapshot_dir": snapshot_dir})
+    server = ThreadingHTTPServer((host, port), handler)
+    print(f"serving {snapshot_dir} on http://{host}:{server.server_port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Publish and serve MIT dashboard snapshots.")
+    parser.add_argument("--dir", default=SNAPSHOT_DIR, help="snapshot directory (default: .snapshots)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve_cmd = commands.add_parser("serve", help="serve the snapshots over HTTP, read-only")
+    serve_cmd.add_argument("--host", default="127.0.0.1")
+    serve_cmd.add_argument("--port", type=int, default=8600)
+    write_cmd = commands.add_parser("write", help="load the sheets and publish a snapshot")
+    write_cmd.add_argument("--candidates", help="URL or local CSV for the candidate sheet (default: published Google Sheet)")
+    write_cmd.add_argument("--jobs", help="URL or local CSV for the open jobs sheet (default: published Google Sheet)")
+    write_cmd.add_argument("--today", help="reference date for weeks in program, e.g. 2026-01-05 (default: now)")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        serve(args.dir, args.host, args.port)
+        return 0
+
+    sources = {name: src for name, src in [("candidates", args.candidates), ("jobs", args.jobs)] if src}
+    data = load_dashboard_data(sources, today=args.today, store_path=None)
+    for level, message in data["notices"]:
+        print(f"{level}: {message}")
+    if data["df"].empty:
+        return 1
+    wrote = write_snapshot(data, args.dir)
+    print(f"{'published' if wrote else 'already published'} {data['version']} in {args.dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,66 @@
+"""Metrics history rows are filed under the local date the app's trend range uses."""
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from history import MetricsHistory, local_today, record_history
+
+
+@pytest.fixture
+def los_angeles(monkeypatch):
+    monkeypatch.setenv("TZ", "America/Los_Angeles")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def _data(version, loaded_at, rows=3):
+    return {
+        "version": version,
+        "loaded_at": loaded_at,
+        "df": pd.DataFrame({"Stage": ["Offer Pending"] * rows}),
+        "metrics": {"Total Candidates": rows, "Open Positions": 2},
+        "notices": [],
+    }
+
+
+def test_aware_loaded_at_is_filed_under_the_local_date(tmp_path, los_angeles):
+    history = MetricsHistory(str(tmp_path))
+    # 02:30 UTC on the 17th is still the evening of the 16th in Los Angeles
+    assert history.append(_data("v1", pd.Timestamp("2026-10-17T02:30:00Z")))
+    assert os.listdir(tmp_path) == ["date=2026-10-16"]
+    rows = history.read("2026-10-16", "2026-10-16")
+    assert rows["loaded_at"].tolist() == [pd.Timestamp("2026-10-16T19:30:00")]
+
+
+def test_today_range_reads_a_load_from_now(tmp_path, los_angeles):
+    history = MetricsHistory(str(tmp_path))
+    history.append(_data("v1", pd.Timestamp.now(tz="UTC")))
+    assert history.read(local_today(), local_today())["version"].tolist() == ["v1"]
+
+
+def test_record_history_skips_empty_loads_and_records_a_version_once(tmp_path):
+    record_history(_data("empty", pd.Timestamp.now(), rows=0), str(tmp_path))
+    assert not os.listdir(tmp_path)
+    for _ in range(2):
+        record_history(_data("v1", pd.Timestamp.now()), str(tmp_path))
+    assert MetricsHistory(str(tmp_path)).read()["version"].tolist() == ["v1"]
+
+
+def test_data_that_changes_back_is_recorded_again(tmp_path):
+    history = MetricsHistory(str(tmp_path))
+    start = pd.Timestamp("2026-10-16T09:00:00")
+    loads = [("A", 3), ("A", 3), ("B", 5), ("B", 5), ("A", 3)]
+    wrote = [
+        history.append(_data(version, start + pd.Timedelta(minutes=i), rows=rows))
+        for i, (version, rows) in enumerate(loads)
+    ]
+    assert wrote == [True, False, True, False, True]
+    assert history.last_version() == "A"
+    rows = history.read()
+    assert rows["version"].tolist() == ["A", "B", "A"]
+    # The trend's last point shows the reverted counts, not B's
+    assert rows["Total Candidates"].iloc[-1] == 3
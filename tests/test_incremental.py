@@ -0,0 +1,76 @@
+"""Incremental rankings must equal rankings scored from scratch, ties included."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import candidates_frame, jobs_frame
+from incremental import update_rankings
+from matching import candidate_features, job_features, top_candidate_indices, top_job_indices
+
+ROUNDS = 8
+K = 3
+
+
+def _edit(sheet, fresh, rng):
+    """``sheet`` with some rows dropped, some cells edited, rows from ``fresh`` inserted, then shuffled."""
+    n = len(sheet)
+    sheet = sheet.drop(index=sheet.index[rng.choice(n, size=rng.integers(0, n // 10 + 1), replace=False)])
+    edited = rng.choice(len(sheet), size=rng.integers(0, len(sheet) // 10 + 1), replace=False)
+    for col in rng.choice(sheet.columns, size=2, replace=False):
+        values = sheet[col].to_numpy(dtype=object).copy()
+        values[edited] = rng.permutation(values)[edited]
+        sheet[col] = values
+    inserted = fresh.iloc[rng.choice(len(fresh), size=rng.integers(0, 6), replace=False)]
+    at = rng.integers(0, len(sheet) + 1)
+    sheet = pd.concat([sheet.iloc[:at], inserted, sheet.iloc[at:]])
+    if rng.random() < 0.3:
+        sheet = sheet.iloc[rng.permutation(len(sheet))]
+    return sheet.reset_index(drop=True)
+
+
+def _assert_matches_full(rankings, cand_feats, job_feats, k):
+    top_jobs, top_cands = rankings
+    job_cols, job_scores = top_job_indices(cand_feats, job_feats, k)
+    cand_rows, cand_scores = top_candidate_indices(cand_feats, job_feats, k)
+    np.testing.assert_array_equal(top_jobs.cols, job_cols)
+    np.testing.assert_array_equal(top_jobs.scores, job_scores)
+    np.testing.assert_array_equal(top_cands.cols, cand_rows)
+    np.testing.assert_array_equal(top_cands.scores, cand_scores)
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+@pytest.mark.parametrize("blocking", [False, True])
+def test_update_rankings_matches_full_rescore(seed, blocking):
+    rng = np.random.default_rng(seed)
+    candidates, jobs = candidates_frame(300, seed), jobs_frame(200, seed)
+    fresh_candidates, fresh_jobs = candidates_frame(50, seed + 100), jobs_frame(50, seed + 100)
+    previous = None
+    for _ in range(ROUNDS):
+        cand_feats, job_feats = candidate_features(candidates), job_features(jobs)
+        rankings, _ = update_rankings(previous, cand_feats, job_feats, K, blocking=blocking)
+        _assert_matches_full(rankings, cand_feats, job_feats, K)
+        previous = rankings
+
+        side = rng.integers(3)
+        if side != 1:
+            candidates = _edit(candidates, fresh_candidates, rng)
+        if side != 0:
+            jobs = _edit(jobs, fresh_jobs, rng)
+
+
+def test_update_rankings_after_k_changes():
+    candidates, jobs = candidates_frame(120, 5), jobs_frame(80, 5)
+    cand_feats, job_feats = candidate_features(candidates), job_features(jobs)
+    previous, _ = update_rankings(None, cand_feats, job_feats, K)
+    rankings, _ = update_rankings(previous, cand_feats, job_feats, K + 2)
+    _assert_matches_full(rankings, cand_feats, job_feats, K + 2)
+
+
+def test_unchanged_rows_are_not_rescored():
+    candidates, jobs = candidates_frame(120, 6), jobs_frame(80, 6)
+    cand_feats, job_feats = candidate_features(candidates), job_features(jobs)
+    previous, _ = update_rankings(None, cand_feats, job_feats, K)
+    rankings, stats = update_rankings(previous, cand_feats, job_feats, K)
+    _assert_matches_full(rankings, cand_feats, job_feats, K)
+    assert stats["candidates"]["rescored"] == 0
+    assert stats["jobs"]["rescored"] == 0
@@ -0,0 +1,44 @@
+"""Location parsing and the distance test used by the geo subscore."""
+import numpy as np
+import pytest
+
+from locations import EARTH_RADIUS_MILES, load_gazetteer, parse_locations, unit_vectors, within_miles_threshold
+
+
+def haversine_miles(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(a))
+
+
+@pytest.mark.parametrize("miles", [25, 100, 250])
+def test_within_miles_threshold_agrees_with_haversine(miles):
+    gazetteer = load_gazetteer()
+    lat, lon = gazetteer["lat"].to_numpy(), gazetteer["lon"].to_numpy()
+    xyz = unit_vectors(lat, lon)
+    within = xyz @ xyz.T >= within_miles_threshold(miles)
+    distance = haversine_miles(lat[:, None], lon[:, None], lat[None, :], lon[None, :])
+    # Pairs within a hair of the threshold can go either way in floating point
+    clear = np.abs(distance - miles) > 1e-6
+    np.testing.assert_array_equal(within[clear], (distance <= miles)[clear])
+
+
+@pytest.mark.parametrize(
+    "text, city, state",
+    [
+        ("Seattle, WA", "seattle", "wa"),
+        ("seattle wa", "seattle", "wa"),
+        ("Seattle", "seattle", ""),
+        ("Seattle, USA", "seattle", ""),
+        ("Saint Louis, Missouri", "st louis", "mo"),
+        ("Texas", "", "tx"),
+        ("WA", "", "wa"),
+        # Both a state and a gazetteer city: the city wins
+        ("New York", "new york", ""),
+        ("Washington", "washington", ""),
+        ("Washington, DC", "washington", "dc"),
+    ],
+)
+def test_parse_locations(text, city, state):
+    cities, states = parse_locations([text])
+    assert (cities[0], states[0]) == (city, state)
@@ -0,0 +1,29 @@
+"""Score store queries are answered only by the version asked for."""
+import pytest
+
+from benchmarks.synthetic import candidates_frame, jobs_frame
+from matching import candidate_features, job_features
+from score_store import KEEP_VERSIONS, ScoreStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ScoreStore(str(tmp_path / "scores.sqlite"))
+    for seed in range(KEEP_VERSIONS + 1):
+        store.write(f"v{seed}", candidate_features(candidates_frame(40, seed)), job_features(jobs_frame(30, seed)))
+    return store
+
+
+def test_pruned_version_answers_empty(store):
+    assert not store.has_version("v0")
+    assert store.latest_version() == f"v{KEEP_VERSIONS}"
+    assert store.candidates_for_job("v0", job=12).empty
+    assert store.jobs_for_candidate("v0", "Candidate 00000").empty
+    assert store.top_candidates_per_job("v0").empty
+
+
+def test_stored_version_answers_its_own_rows(store):
+    ranked = store.candidates_for_job("v1", job=12, k=5)
+    assert len(ranked) == 5
+    assert ranked["Job"].eq(12).all()
+    assert ranked["Rank"].tolist() == [1, 2, 3, 4, 5]
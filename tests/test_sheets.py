@@ -0,0 +1,135 @@
+"""Sheet fetching against a local HTTP stand-in for the published Google Sheets."""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import requests
+import pytest
+
+from sheets import DOWNLOADED, NOT_MODIFIED, STALE, UNCHANGED, Sheet, fetch_sheet, fetch_sheets, make_session
+
+CSV = b"MIT Name,Status\nAda,training\nGrace,unassigned\n"
+
+
+class SheetServer:
+    """Serves ``payload`` with an ETag, or ``status`` when it is set; counts requests."""
+
+    def __init__(self, payload=CSV, etag='"v1"', delay=0):
+        self.payload, self.etag, self.delay = payload, etag, delay
+        self.status = None
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests.append(dict(self.headers))
+                time.sleep(server.delay)
+                if server.status is not None:
+                    self.send_error(server.status)
+                    return
+                if server.etag and self.headers.get("If-None-Match") == server.etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "text/csv")
+                self.send_header("Content-Length", str(len(server.payload)))
+                if server.etag:
+                    self.send_header("ETag", server.etag)
+                self.end_headers()
+                self.wfile.write(server.payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/sheet.csv"
+        threading.Thread(target=self.httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    server = SheetServer()
+    yield server
+    server.close()
+
+
+def test_downloads_then_not_modified(server, tmp_path):
+    df, how = fetch_sheet(server.url, "candidates", cache_dir=str(tmp_path))
+    assert how == DOWNLOADED
+    assert df["MIT Name"].tolist() == ["Ada", "Grace"]
+
+    df, how = fetch_sheet(server.url, "candidates", cache_dir=str(tmp_path))
+    assert how == NOT_MODIFIED
+    assert server.requests[-1]["If-None-Match"] == '"v1"'
+    assert df["MIT Name"].tolist() == ["Ada", "Grace"]
+
+
+def test_unchanged_payload_is_not_parsed_again(server, tmp_path, monkeypatch):
+    fetch_sheet(server.url, "candidates", cache_dir=str(tmp_path))
+    # A new ETag forces a full response, but the bytes are the same
+    server.etag = '"v2"'
+
+    def no_parse(*args, **kwargs):
+        raise AssertionError("unchanged payload was parsed again")
+
+    monkeypatch.setattr(pd, "read_csv", no_parse)
+    df, how = fetch_sheet(server.url, "candidates", cache_dir=str(tmp_path))
+    assert how == UNCHANGED
+    assert df["MIT Name"].tolist() == ["Ada", "Grace"]
+
+
+def test_server_error_serves_the_snapshot(server, tmp_path):
+    fetch_sheet(server.url, "candidates", cache_dir=str(tmp_path))
+    server.status = 503
+    df, how = fetch_sheet(server.url, "candidates", cache_dir=str(tmp_path), retries=1, backoff=0)
+    assert how == STALE
+    assert df["MIT Name"].tolist() == ["Ada", "Grace"]
+    # The first request downloaded; the 503 was retried once
+    assert len(server.requests) == 3
+
+
+def test_server_error_without_snapshot_raises(server, tmp_path):
+    server.status = 500
+    with pytest.raises(requests.HTTPError):
+        fetch_sheet(server.url, "candidates", cache_dir=str(tmp_path))
+
+
+DELAY = 0.3
+
+
+@pytest.fixture
+def slow_servers():
+    servers = [SheetServer(delay=DELAY), SheetServer(delay=DELAY)]
+    yield servers
+    for server in servers:
+        server.close()
+
+
+def test_sheets_are_fetched_concurrently(slow_servers, tmp_path):
+    sheets = [Sheet(f"sheet{i}", server.url) for i, server in enumerate(slow_servers)]
+    started = time.perf_counter()
+    results = fetch_sheets(sheets, cache_dir=str(tmp_path), session=make_session())
+    elapsed = time.perf_counter() - started
+    assert [result.how for result in results.values()] == [DOWNLOADED, DOWNLOADED]
+    # One delay, not the sum of both
+    assert elapsed < 1.6 * DELAY
+
+
+def test_each_sheet_uses_its_own_timeout_and_retries(slow_servers, tmp_path):
+    slow, fast = slow_servers
+    fast.delay = 0
+    sheets = [
+        Sheet("slow", slow.url, timeout=DELAY / 3, retries=1),
+        Sheet("fast", fast.url, timeout=DELAY / 3, retries=0),
+    ]
+    results = fetch_sheets(sheets, cache_dir=str(tmp_path), session=make_session())
+    assert isinstance(results["slow"].error, requests.Timeout)
+    assert results["fast"].how == DOWNLOADED and results["fast"].error is None
+    # The timed-out sheet was tried once more, the other only once
+    assert (len(slow.requests), len(fast.requests)) == (2, 1)
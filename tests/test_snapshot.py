@@ -0,0 +1,50 @@
+"""Snapshots follow the dashboard's data, including back to a version seen before."""
+import threading
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from benchmarks.synthetic import candidates_csv, jobs_csv
+from compute import load_dashboard_data
+from snapshot import SnapshotHandler, latest_version, write_snapshot
+
+TODAY = "2026-01-05"
+
+
+def _load(tmp_path, seed):
+    cand_path, jobs_path = tmp_path / f"candidates{seed}.csv", tmp_path / f"jobs{seed}.csv"
+    cand_path.write_bytes(candidates_csv(40, seed, TODAY))
+    jobs_path.write_bytes(jobs_csv(20, seed))
+    return load_dashboard_data({"candidates": str(cand_path), "jobs": str(jobs_path)}, today=TODAY, store_path=None)
+
+
+@pytest.fixture
+def snapshot_dir(tmp_path):
+    return str(tmp_path / "snapshots")
+
+
+def _served_etag(snapshot_dir):
+    handler = type("Handler", (SnapshotHandler,), {"snapshot_dir": snapshot_dir, "log_message": lambda *args: None})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.server_port}/metrics.json") as resp:
+            return resp.headers["ETag"]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_reverted_data_becomes_latest_again(tmp_path, snapshot_dir):
+    a, b = _load(tmp_path, 0), _load(tmp_path, 1)
+    assert a["version"] != b["version"]
+
+    assert write_snapshot(a, snapshot_dir)
+    assert write_snapshot(b, snapshot_dir)
+    assert _served_etag(snapshot_dir) == f'"{b["version"]}"'
+
+    # A → B → A: nothing new to write, but A is the latest again
+    assert not write_snapshot(a, snapshot_dir)
+    assert latest_version(snapshot_dir) == a["version"]
+    assert _served_etag(snapshot_dir) == f'"{a["version"]}"'